@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Measure how long the src/ library modules take to import, each in a fresh
+interpreter, and fail if a module is over its time budget or pulls in a
+heavy library (matplotlib, nltk, wordcloud, ...) at import time.
+
+    python3 scripts/bench_imports.py
+    python3 scripts/bench_imports.py --budget 0.5 --repeat 5 sentiment_utils
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+MODULES = ["sentiment_utils", "data_utils", "term_utils", "storage_utils", "profile_utils",
+           "synonym_compiler", "lastfmapi_utils"]
+
+# libraries that must only be imported when a function actually needs them
+HEAVY = ["matplotlib", "nltk", "wordcloud", "nrclex", "text2emotion", "sklearn", "scipy"]
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - t
+print(json.dumps({{"seconds": seconds, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, repeat):
+    """Best-of-`repeat` import time of `module` and the heavy libraries it loaded."""
+    times, heavy = [], []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY)],
+            cwd=SRC_DIR, capture_output=True, text=True,
+        )
+        if out.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{out.stderr}")
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(result["seconds"])
+        heavy = result["heavy"]
+    return min(times), statistics.median(times), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark for the src/ modules")
+    parser.add_argument("modules", nargs="*", default=MODULES, help="Modules to measure")
+    parser.add_argument("--budget", type=float, default=1.0, help="Max import time per module, in seconds")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        best, median, heavy = measure(module, args.repeat)
+        status = "ok"
+        if best > args.budget:
+            status, failed = f"SLOW (> {args.budget:.2f}s)", True
+        if heavy:
+            status, failed = f"HEAVY IMPORTS: {', '.join(heavy)}", True
+        print(f"{module:<16} best {best:.3f}s  median {median:.3f}s  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
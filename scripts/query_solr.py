@@ -1,27 +1,38 @@
 #!/usr/bin/env python3
+import argparse
+import hashlib
 import json
+import os
+import sqlite3
+import statistics
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import glob
 import requests
+from requests.adapters import HTTPAdapter
 
-def edismax_query_from_config(config_path, solr_uri):
-    """
-    Execute an EDisMax query in Solr based on a JSON configuration.
-    Supports simple queries or enhanced queries with qf/pf/pf2/pf1/ps/mm/tie.
-    The core is taken from the 'core' attribute in the config.
-    """
-    # === 1. Read JSON config ===
+def load_query_config(config_path):
+    """Read a JSON query config (raises ValueError if missing or invalid)."""
     try:
         with open(config_path, "r", encoding="utf-8") as f:
-            config = json.load(f)
+            return json.load(f)
     except FileNotFoundError:
-        print(f"Config file not found: {config_path}")
-        sys.exit(1)
+        raise ValueError(f"Config file not found: {config_path}")
     except json.JSONDecodeError:
-        print(f"Invalid JSON format in config file: {config_path}")
-        sys.exit(1)
+        raise ValueError(f"Invalid JSON format in config file: {config_path}")
+
 
+def build_query_params(config, fl=None):
+    """
+    Build the EDisMax params for a query config; returns (core, params).
+    Supports simple queries or enhanced queries with qf/pf/pf2/pf1/ps/mm/tie,
+    optionally filtered ("moodFilter") or boosted ("moodBoost") by mood fields.
+    The core is taken from the 'core' attribute in the config.
+    `fl` overrides the returned fields (e.g. "id,score" for TREC runs).
+    """
     # === 2. Base query ===
     base_query = config.get("q", "").strip()
     query_config_type = config.get("queryConfig", "simple")  # 'simple' or 'enhanced'
@@ -35,7 +46,7 @@ def edismax_query_from_config(config_path, solr_uri):
         "defType": "edismax",
         "rows": rows,
         "wt": "json",
-        "fl": "*,score"
+        "fl": fl or config.get("fl", "*,score")
     }
 
     if query_config_type == "enhanced":
@@ -51,89 +62,334 @@ def edismax_query_from_config(config_path, solr_uri):
             "tie": 0.1
         })
 
-    # === 4. Execute query against the specified core ===
-    uri = f"{solr_uri.rstrip('/')}/{core}/select"
+    # === 3b. Mood filters/boosts on the numeric fields from src/datasetMood.py ===
+    # "moodFilter": {"polarity": [null, -0.05], "emotion_sadness": [0.15, null]}
+    #   -> fq range queries, null = open end
+    # "moodBoost": {"emotion_sadness": 3}  -> additive edismax boost function
+    mood_filter = config.get("moodFilter", {})
+    if mood_filter:
+        params["fq"] = [
+            f"{field}:[{'*' if lo is None else lo} TO {'*' if hi is None else hi}]"
+            for field, (lo, hi) in mood_filter.items()
+        ]
+    mood_boost = config.get("moodBoost", {})
+    if mood_boost:
+        params["bf"] = " ".join(f"{field}^{weight}" for field, weight in mood_boost.items())
+
+    return core, params
 
+
+def make_session(pool_size=10):
+    """Keep-alive session with room for `pool_size` concurrent connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _select(session, solr_uri, core, params):
+    uri = f"{solr_uri.rstrip('/')}/{core}/select"
     try:
-        response = requests.get(uri, params=params)
+        response = session.get(uri, params=params, timeout=60)
         response.raise_for_status()
     except requests.RequestException as e:
-        print(f"Error querying Solr core '{core}': {e}")
-        sys.exit(1)
-    print(f"Query executed on core '{core}': {params}")
-    print(f"🔍 Core: {core} | Final Solr query: {base_query}")
+        raise RuntimeError(f"Error querying Solr core '{core}': {e}")
     return response.json()
 
 
+def edismax_query_from_config(config_path, solr_uri, session=None):
+    """
+    Execute an EDisMax query in Solr based on a JSON configuration
+    (see build_query_params) and return the Solr JSON response.
+    """
+    core, params = build_query_params(load_query_config(config_path))
+    return _select(session or requests, solr_uri, core, params)
+
+
+def index_version(session, solr_uri, core):
+    """
+    Version of the core's index, from /admin/luke: the Lucene index version
+    plus the last commit time, so it changes on every reindex (and when the
+    core is deleted and created again).
+    """
+    uri = f"{solr_uri.rstrip('/')}/{core}/admin/luke"
+    try:
+        response = session.get(uri, params={"show": "index", "numTerms": 0, "wt": "json"}, timeout=60)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        raise RuntimeError(f"Error reading the index version of core '{core}': {e}")
+    index = response.json().get("index", {})
+    commit_time = index.get("userData", {}).get("commitTimeMSec", "")
+    return f"{index.get('version')}:{commit_time}"
+
+
+class ResultCache:
+    """
+    Local SQLite store of Solr responses, keyed by core, a hash of the final
+    EDisMax params and the core's index version (see index_version).
+
+    The index version is read once per core and run; entries of older
+    versions are deleted then, so a reindex invalidates the core's results.
+    With `offline`, Solr is not contacted at all: the newest cached version
+    of each core is used and a miss is an error.
+    """
+
+    def __init__(self, path, offline=False):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.offline = offline
+        self.hits = 0
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, core TEXT, version TEXT, body TEXT, created REAL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(core, params, version):
+        payload = json.dumps({"core": core, "params": params, "version": version}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def version(self, session, solr_uri, core):
+        with self._lock:
+            if core not in self._versions:
+                if self.offline:
+                    row = self._conn.execute(
+                        "SELECT version FROM results WHERE core = ? ORDER BY created DESC LIMIT 1", (core,)
+                    ).fetchone()
+                    if row is None:
+                        raise RuntimeError(f"No cached results for core '{core}' (offline)")
+                    self._versions[core] = row[0]
+                else:
+                    version = index_version(session, solr_uri, core)
+                    self._conn.execute("DELETE FROM results WHERE core = ? AND version != ?", (core, version))
+                    self._conn.commit()
+                    self._versions[core] = version
+            return self._versions[core]
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.hits += 1
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, key, core, version, solr_result):
+        body = json.dumps(solr_result, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, core, version, body, created) VALUES (?, ?, ?, ?, ?)",
+                (key, core, version, body, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def run_query(query_file, solr_uri, session, fl=None, cache=None):
+    """
+    Run one query config; returns (solr_result, timing) with Solr QTime and
+    client wall time in ms. With a ResultCache, Solr is only queried on a miss.
+    """
+    core, params = build_query_params(load_query_config(query_file), fl)
+    start = time.perf_counter()
+    solr_result = None
+    if cache is not None:
+        version = cache.version(session, solr_uri, core)
+        key = cache.key(core, params, version)
+        solr_result = cache.get(key)
+        if solr_result is None and cache.offline:
+            raise RuntimeError(f"Query not in cache for core '{core}' (offline)")
+    cached = solr_result is not None
+    if not cached:
+        solr_result = _select(session, solr_uri, core, params)
+        if cache is not None:
+            cache.put(key, core, version, solr_result)
+    wall_ms = (time.perf_counter() - start) * 1000
+    timing = {
+        "core": core,
+        "qtime_ms": solr_result.get("responseHeader", {}).get("QTime"),
+        "wall_ms": round(wall_ms, 1),
+        "num_found": solr_result.get("response", {}).get("numFound"),
+        "cached": cached,
+    }
+    return solr_result, timing
+
+
+def run_queries(query_files, solr_uri, concurrency=8, session=None, fl=None, cache=None):
+    """
+    Run query configs concurrently over one keep-alive session.
+
+    Yields (query_file, solr_result, timing, error) as queries finish;
+    `error` is the exception of a failed query (solr_result/timing are None).
+    """
+    session = session or make_session(concurrency)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(run_query, qf, solr_uri, session, fl, cache): qf for qf in query_files}
+        for future in as_completed(futures):
+            try:
+                solr_result, timing = future.result()
+                yield futures[future], solr_result, timing, None
+            except Exception as e:
+                yield futures[future], None, None, e
+
+
+def print_timings(timings, total_seconds):
+    """Per-query QTime vs wall time and a summary (wall - QTime = network + JSON overhead)."""
+    print(f"{'query':<12} {'core':<8} {'QTime':>7} {'wall':>9} {'found':>7}")
+    for key, t in sorted(timings.items(), key=lambda x: str(x[0])):
+        cached = "  (cache)" if t.get("cached") else ""
+        # responses without responseHeader/response have no QTime/numFound
+        qtime = "-" if t["qtime_ms"] is None else f"{t['qtime_ms']}ms"
+        found = "-" if t["num_found"] is None else t["num_found"]
+        print(f"{str(key):<12} {t['core']:<8} {qtime:>7} {t['wall_ms']:>7.1f}ms {found:>7}{cached}")
+    if timings:
+        qtimes = [t["qtime_ms"] or 0 for t in timings.values()]
+        walls = sorted(t["wall_ms"] for t in timings.values())
+        hits = sum(1 for t in timings.values() if t.get("cached"))
+        print(f"{len(timings)} queries in {total_seconds:.2f}s ({hits} from cache) | "
+              f"QTime sum {sum(qtimes)}ms | wall median {statistics.median(walls):.1f}ms, "
+              f"max {walls[-1]:.1f}ms")
+
+
+def query_key(query_file):
+    """Query id of a config file: its name, as an int if possible."""
+    filename = Path(query_file).stem
+    try:
+        return int(filename)
+    except ValueError:
+        return filename
+
+
+def write_legacy_json(run_path, query_files, output_path_full, output_path_simple):
+    """
+    Rebuild the old solr_output.json / solr_output_format.json from a run
+    file, in query file order (loads every result in memory).
+    """
+    results = {}
+    with open(run_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                result = json.loads(line)
+                results[result.pop("query")] = result
+
+    results_full = {}
+    results_simple = {}
+    for key in map(query_key, query_files):
+        if key not in results:
+            continue
+        results_full[key] = results[key]
+
+        # Extract simplified docs
+        simple_docs = []
+        for doc in results[key].get("response", {}).get("docs", []):
+            simple_doc = {
+                "id": doc.get("id"),
+                "song_name": doc.get("song_name", []),
+                "artist_name": doc.get("artist_name", [])
+            }
+            simple_docs.append(simple_doc)
+
+        results_simple[key] = {"response": {"docs": simple_docs}}
+
+    with open(output_path_full, "w", encoding="utf-8") as f:
+        json.dump(results_full, f, indent=2, ensure_ascii=False)
+    with open(output_path_simple, "w", encoding="utf-8") as f:
+        json.dump(results_simple, f, indent=2, ensure_ascii=False)
+
+
 def main():
     """
     Reads all JSON query configs in a 'queries' folder,
-    executes each query in its specified core,
-    and writes both full and simplified results to JSON files.
+    executes them concurrently, each in its specified core,
+    and streams the results to a run file, one JSON line per query
+    ({"query": id, "responseHeader": ..., "response": ...}) as they arrive.
     """
     sys.stdout.reconfigure(encoding='utf-8')
 
-    query_folder = Path("./config/queries")
-    solr_uri = "http://localhost:8983/solr"
+    parser = argparse.ArgumentParser(description="Run the query configs against Solr")
+    parser.add_argument("--queries", default="./config/queries", help="Folder with the JSON query configs")
+    parser.add_argument("--solr", default="http://localhost:8983/solr", help="Solr base URL")
+    parser.add_argument("--concurrency", type=int, default=8, help="Queries in flight at once")
+    parser.add_argument("--output", default="results/solr_run.jsonl", help="Run file (one JSON line per query)")
+    parser.add_argument("--fl", help="Fields to return for every query, e.g. 'id,score' (default: the config's fl or '*,score')")
+    parser.add_argument("--ids-only", action="store_true", help="Shortcut for --fl id,score (no stored fields transferred)")
+    parser.add_argument("--cache", default="results/query_cache.sqlite",
+                        help="SQLite cache of Solr responses, invalidated when a core is reindexed")
+    parser.add_argument("--no-cache", action="store_true", help="Always query Solr")
+    parser.add_argument("--offline", action="store_true",
+                        help="Only use cached results, without contacting Solr (misses are errors)")
+    parser.add_argument("--json", action="store_true",
+                        help="Also write the old results/solr_output.json and solr_output_format.json")
+    args = parser.parse_args()
+
+    query_folder = Path(args.queries)
+    solr_uri = args.solr
+    fl = "id,score" if args.ids_only else args.fl
+    if args.offline and args.no_cache:
+        parser.error("--offline needs the cache")
+    cache = None if args.no_cache else ResultCache(args.cache, offline=args.offline)
 
     query_files = sorted(glob.glob(query_folder.joinpath("*.json").as_posix()))
     if not query_files:
         print(f"No query files found in {query_folder}")
         sys.exit(1)
 
-    results_full = {}
-    results_simple = {}
+    timings = {}
     fields_to_list = ["song_name", "song_lyrics", "album_name", "artist_name", "artist_bio"]
 
-    for idx, query_file in enumerate(query_files):
-        filename = Path(query_file).stem
-        print(f"Running query {filename} ...")
-
-        try:
-            solr_result = edismax_query_from_config(query_file, solr_uri)
-
-            # Normalize certain fields to always be lists
-            for doc in solr_result.get("response", {}).get("docs", []):
-                for f in fields_to_list:
-                    if f in doc and not isinstance(doc[f], list):
-                        doc[f] = [doc[f]]
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # the previous run file is only replaced once this run produced results
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    start = time.perf_counter()
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            for query_file, solr_result, timing, error in run_queries(query_files, solr_uri, args.concurrency, fl=fl, cache=cache):
+                key = query_key(query_file)
+                if error is not None:
+                    print(f"Error running query {key}: {error}")
+                    continue
+                print(f"Query {key} done on core '{timing['core']}'")
 
-            # Use integer key if possible
-            try:
-                key = int(filename)
-            except ValueError:
-                key = filename
-
-            results_full[key] = solr_result
-
-            # Extract simplified docs
-            simple_docs = []
-            for doc in solr_result.get("response", {}).get("docs", []):
-                simple_doc = {
-                    "id": doc.get("id"),
-                    "song_name": doc.get("song_name", []),
-                    "artist_name": doc.get("artist_name", [])
-                }
-                simple_docs.append(simple_doc)
-
-            results_simple[key] = {"response": {"docs": simple_docs}}
-
-        except Exception as e:
-            print(f"Error running query {filename}: {e}")
-            continue
+                # Normalize certain fields to always be lists
+                for doc in solr_result.get("response", {}).get("docs", []):
+                    for f in fields_to_list:
+                        if f in doc and not isinstance(doc[f], list):
+                            doc[f] = [doc[f]]
 
-    # Save results
-    output_path_full = Path("results/solr_output.json")
-    output_path_full.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path_full, "w", encoding="utf-8") as f:
-        json.dump(results_full, f, indent=2, ensure_ascii=False)
+                # one line per query, in the order they finish; nothing kept in memory
+                out.write(json.dumps({"query": key, **solr_result}, ensure_ascii=False) + "\n")
+                out.flush()
+                timings[key] = timing
+        if timings:
+            os.replace(tmp_path, output_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        if cache is not None:
+            cache.close()
+    total_seconds = time.perf_counter() - start
 
-    output_path_simple = Path("results/solr_output_format.json")
-    with open(output_path_simple, "w", encoding="utf-8") as f:
-        json.dump(results_simple, f, indent=2, ensure_ascii=False)
+    print_timings(timings, total_seconds)
+    if not timings:
+        print(f"All queries failed; {output_path} was left unchanged")
+        sys.exit(1)
+    print(f"Run file saved at: {output_path.resolve()}")
 
-    print(f"Full results saved at: {output_path_full.resolve()}")
-    print(f"Simplified results saved at: {output_path_simple.resolve()}")
+    if args.json:
+        output_path_full = Path("results/solr_output.json")
+        output_path_simple = Path("results/solr_output_format.json")
+        write_legacy_json(output_path, query_files, output_path_full, output_path_simple)
+        print(f"Full results saved at: {output_path_full.resolve()}")
+        print(f"Simplified results saved at: {output_path_simple.resolve()}")
 
 
 if __name__ == "__main__":
@@ -4,8 +4,39 @@ import argparse
 import json
 import sys
 
+def iter_results(f):
+    """
+    Yield (query_id, solr_response) from a results file, reading it incrementally.
+
+    Accepts the run file written by query_solr.py (one JSON line per query,
+    with a "query" key) and the old solr_output.json ({query_id: response}),
+    which has to be loaded whole.
+    """
+    first = f.readline()
+    while first and not first.strip():
+        first = f.readline()
+    if not first:
+        # empty file: no queries
+        return
+    try:
+        record = json.loads(first)
+    except json.JSONDecodeError:
+        record = None
+    if not isinstance(record, dict) or "query" not in record:
+        yield from json.loads(first + f.read()).items()
+        return
+
+    yield record.pop("query"), record
+    for line in f:
+        if line.strip():
+            record = json.loads(line)
+            yield record.pop("query"), record
+
 def solr_to_trec(solr_response, run_id="run0"):
-    for query_id, response in solr_response.items():
+    # a {query_id: response} dict or an iterable of (query_id, response)
+    if isinstance(solr_response, dict):
+        solr_response = solr_response.items()
+    for query_id, response in solr_response:
         try:
             docs = response["response"]["docs"]
             for rank, doc in enumerate(docs, start=1):
@@ -17,14 +48,12 @@ def solr_to_trec(solr_response, run_id="run0"):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Convert Solr results to TREC format.")
     parser.add_argument("--run-id", type=str, default="run0", help="Experiment or system identifier (default: run0).")
-    parser.add_argument("--input", type=str, help="Path to JSON file with Solr results. If not provided, reads from stdin.")
+    parser.add_argument("--input", type=str, help="Path to the run file (JSON lines) or JSON file with Solr results. If not provided, reads from stdin.")
 
     args = parser.parse_args()
 
     if args.input:
         with open(args.input, "r", encoding="utf-8") as f:
-            solr_response = json.load(f)
+            solr_to_trec(iter_results(f), args.run_id)
     else:
-        solr_response = json.load(sys.stdin)
-
-    solr_to_trec(solr_response, args.run_id)
+        solr_to_trec(iter_results(sys.stdin), args.run_id)
@@ -1,6 +1,14 @@
+import re
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+
+from profile_utils import print_report, print_report_details, profile_table, write_report
+from storage_utils import TableAppender, compact_dtypes, iter_table, read_table, remove_table, write_table
+from term_utils import EXTRA_STOPWORDS, count_terms
+
+# matplotlib and wordcloud are imported inside the functions that draw, so
+# importing this module stays cheap for the cleaning/merging pipeline
 
 
 def load_data():
@@ -11,9 +19,42 @@ def load_data():
     return csv_songs
 
 
-def load_process_data():
-    csv_songs = pd.read_csv('processData/song.csv')
-    csv_artist = pd.read_csv('processData/artist.csv')
+# compact dtypes per table (see storage_utils.compact_dtypes)
+SONG_DTYPES = {
+    "categorical": ['album_name', 'artist_name', 'artist'],
+    "ids": ['id', 'song_id', 'artist_id'],
+    "text": ['song_lyrics', 'text', 'song', 'song_name'],
+}
+ARTIST_DTYPES = {
+    "categorical": [],
+    "ids": ['id', 'artist_id'],
+    "text": ['artist_bio', 'lastfm_artist_bio', 'artist_name', 'artist'],
+}
+
+
+def load_song_table(path, columns=None):
+    """Load a song table with categorical album/artist names, int32 ids and Arrow-backed text."""
+    return compact_dtypes(read_table(path, columns=columns), **SONG_DTYPES)
+
+
+def load_artist_table(path, columns=None):
+    """Load an artist table with int32 ids and Arrow-backed text."""
+    return compact_dtypes(read_table(path, columns=columns), **ARTIST_DTYPES)
+
+
+def load_process_data(song_path='processData/song.csv', artist_path='processData/artist.csv',
+                      song_columns=None, artist_columns=None, compact=False):
+    """
+    Load the processed song and artist tables (CSV or ".parquet").
+    `song_columns`/`artist_columns` load only those columns, e.g. ['song_lyrics'].
+    With `compact` the tables use the memory-compact dtypes of load_song_table/load_artist_table.
+    """
+    if compact:
+        csv_songs = load_song_table(song_path, columns=song_columns)
+        csv_artist = load_artist_table(artist_path, columns=artist_columns)
+    else:
+        csv_songs = read_table(song_path, columns=song_columns)
+        csv_artist = read_table(artist_path, columns=artist_columns)
     print("data loaded")
 
     return csv_songs, csv_artist
@@ -26,47 +67,23 @@ def averaNSongPerArtist(df):
     return average_songs
 
 
-def dataAnalysis(df):
+def dataAnalysis(df, report_path=None, chunksize=100_000):
     """
-    Perform basic exploratory data analysis on a DataFrame.
-    Prints dataset overview, missing values, duplicates, basic stats, and sample distributions.
+    Perform basic exploratory data analysis on a DataFrame (or CSV/Parquet path).
+    All statistics come from one pass of profile_utils.profile_table; the report
+    is printed, optionally saved as JSON to `report_path`, and returned.
     """
-    
-    print("===== DATAFRAME SHAPE =====")
-    print(f"Rows: {df.shape[0]}, Columns: {df.shape[1]}\n")
-    
-    print("===== COLUMN NAMES AND DATA TYPES =====")
-    print(df.dtypes, "\n")
-    
-
-    print("===== MISSING VALUES =====")
-    missing = df.isnull().sum()
-    print(missing[missing > 0] if missing.sum() > 0 else "No missing values\n")
-    
-    print("===== DUPLICATE ROWS =====")
-    dup_rows = df[df.duplicated()]
-    print(f"Number of duplicate rows: {dup_rows.shape[0]}\n")
-    
-    
-    print("===== UNIQUE VALUES PER COLUMN =====")
-    for col in df.columns:
-        print(f"{col}: {df[col].nunique()} unique values")
-    print()
-    print("===== Average song per artis =====")
-    print(averaNSongPerArtist(df))
-    print()
-    print("===== BASIC STATISTICS FOR NUMERIC COLUMNS =====")
-    numeric_cols = df.select_dtypes(include='number')
-    if not numeric_cols.empty:
-        print(numeric_cols.describe(), "\n")
-    else:
-        print("No numeric columns.\n")
-    
-    print("===== MOST FREQUENT VALUES FOR CATEGORICAL COLUMNS =====")
-    cat_cols = df.select_dtypes(include='object')
-    for col in cat_cols:
-        top = df[col].value_counts().head(5)
-        print(f"{col}:\n{top}\n")
+    report = profile_table(df, chunksize=chunksize)
+    if report_path:
+        write_report(report, report_path)
+
+    print_report(report, details=False)
+    if isinstance(df, pd.DataFrame):
+        print("===== Average song per artis =====")
+        print(averaNSongPerArtist(df))
+        print()
+    print_report_details(report)
+    return report
     
 def plot_artist_frequency(df, col='artist', top_n=20,most=True):
     """
@@ -88,6 +105,7 @@ def plot_artist_frequency(df, col='artist', top_n=20,most=True):
         artist_counts = df[col].value_counts().tail(top_n)
 
     # Plot
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(12,6))
     artist_counts.plot(kind='bar', color='skyblue')
     plt.title(f"Top {top_n} Most Frequent Artists") if most else plt.title(f"Top {top_n} Least Frequent Artists")
@@ -115,6 +133,7 @@ def plot_column_frequency(df, col, top_n=20):
     counts = df[col].value_counts().head(top_n)
     
     # Plot
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(12,6))
     counts.plot(kind='bar', color='skyblue')
     plt.title(f"Top {top_n} Most Frequent Values in '{col}'")
@@ -126,71 +145,88 @@ def plot_column_frequency(df, col, top_n=20):
 
 
 
-def dataProcessAnalysis(df):
+def dataProcessAnalysis(df, report_path=None, chunksize=100_000):
     """
-    Perform basic exploratory data analysis on a DataFrame.
-    Prints dataset overview, missing values, duplicates, basic stats, and sample distributions.
+    Print dataset overview, missing values, duplicates and unique values per
+    column from a single profile_utils pass; returns the report (optionally saved as JSON).
     """
-    
-    print("===== DATAFRAME SHAPE =====")
-    print(f"Rows: {df.shape[0]}, Columns: {df.shape[1]}\n")
-    
-    print("===== COLUMN NAMES AND DATA TYPES =====")
-    print(df.dtypes, "\n")
-    
+    report = profile_table(df, chunksize=chunksize)
+    if report_path:
+        write_report(report, report_path)
+    print_report(report, details=False)
+    return report
 
-    print("===== MISSING VALUES =====")
-    missing = df.isnull().sum()
-    print(missing[missing > 0] if missing.sum() > 0 else "No missing values\n")
-    
-    print("===== DUPLICATE ROWS =====")
-    dup_rows = df[df.duplicated()]
-    print(f"Number of duplicate rows: {dup_rows.shape[0]}\n")
-    
-    
-    print("===== UNIQUE VALUES PER COLUMN =====")
-    for col in df.columns:
-        print(f"{col}: {df[col].nunique()} unique values")
-    print()
 
-    
 
-    
-import matplotlib.pyplot as plt
+# artist_bio problems reported by classify_artist_bios
+BIO_OK, BIO_MULTIPLE_ARTISTS, BIO_READ_MORE_ONLY, BIO_NULL = 0, 1, 2, 3
+
+_READ_MORE = "Read more on Last.fm"
+_MULTIPLE_ARTISTS_RE = re.compile(r'\s*there are\b', re.IGNORECASE)
+# the whole bio is "Read more on Last.fm", ignoring \r\n\t anywhere and surrounding whitespace
+_READ_MORE_ONLY_RE = re.compile(r'\s*' + '[\r\n\t]*'.join(re.escape(c) for c in _READ_MORE) + r'\s*')
+_READ_MORE_TAIL_RE = re.compile(r'\s*Read more on Last\.fm.*$', re.IGNORECASE)
+
+
+def classify_artist_bios(bios):
+    """
+    Classify and clean an artist_bio column in one stage.
+
+    Returns (codes, cleaned): `codes` is an int8 array with BIO_OK or the problem
+    found in each row (bio starts with "There are", is only "Read more on Last.fm",
+    or is null) and `cleaned` is the column with the trailing "Read more on Last.fm"
+    removed from the BIO_OK rows. The checks are anchored, precompiled patterns,
+    so they stop at the first mismatching character instead of scanning the bio.
+    """
+    if bios.dtype != object:
+        # a CSV chunk whose bios are all empty is read as float64
+        bios = bios.astype(object)
+    null = bios.isna().to_numpy()
+    multiple = bios.str.match(_MULTIPLE_ARTISTS_RE, na=False).to_numpy(dtype=bool)
+    read_more = bios.str.fullmatch(_READ_MORE_ONLY_RE, na=False).to_numpy(dtype=bool)
+    codes = np.select(
+        [null, multiple, read_more],
+        [BIO_NULL, BIO_MULTIPLE_ARTISTS, BIO_READ_MORE_ONLY],
+        BIO_OK,
+    ).astype(np.int8)
+
+    keep = codes == BIO_OK
+    cleaned = bios.copy()
+    cleaned[keep] = bios[keep].str.replace(_READ_MORE_TAIL_RE, '', regex=True)
+    return codes, cleaned
+
+
+def count_bio_problems(codes):
+    return {
+        "Starts with 'There are'": int((codes == BIO_MULTIPLE_ARTISTS).sum()),
+        "Read more on Last.fm": int((codes == BIO_READ_MORE_ONLY).sum()),
+        "Null values": int((codes == BIO_NULL).sum()),
+    }
 
 
 def getWrongArtistBios(df, col='artist_bio'):
-    # IDs where artist_bio starts with "There are"
-    multiple_artistsId = df.loc[
-    df[col].str.contains(r'^\s*there are\b', case=False, na=False, regex=True),
-    'id'
-    ].tolist()
-    
+    codes, _ = classify_artist_bios(df[col])
+    ids = df['id'].to_numpy()
 
+    # IDs where artist_bio starts with "There are"
+    multiple_artistsId = ids[codes == BIO_MULTIPLE_ARTISTS].tolist()
     # IDs where artist_bio is exactly "Read more on Last.fm"
-    read_moreId = df.loc[
-        df[col].str.replace(r'[\r\n\t]+', '', regex=True).str.strip().eq("Read more on Last.fm"),
-        'id'
-    ].tolist()    
+    read_moreId = ids[codes == BIO_READ_MORE_ONLY].tolist()
     # IDs where artist_bio is null
-    null_artist_bio = df.loc[df[col].isnull(), 'id'].tolist()
-
+    null_artist_bio = ids[codes == BIO_NULL].tolist()
 
     return multiple_artistsId ,read_moreId , null_artist_bio
 
 
 def printWrongArtistBios(df,col):
 
-    multiple_artistsId, read_moreId, null_ids = getWrongArtistBios(df,col)
+    codes, _ = classify_artist_bios(df[col])
 
     # Count occurrences
-    counts = {
-        "Starts with 'There are'": len(multiple_artistsId),
-        "Read more on Last.fm": len(read_moreId),
-        "Null values": len(null_ids)
-    }
+    counts = count_bio_problems(codes)
 
     # Show plot
+    import matplotlib.pyplot as plt
     plt.bar(counts.keys(), counts.values(), color=['skyblue', 'salmon', 'lightgreen'])
     plt.title("Contagem de artist_bio problemáticos")
     plt.ylabel("Número de ocorrências")
@@ -198,7 +234,7 @@ def printWrongArtistBios(df,col):
     plt.show()
 
     # Return all problematic IDs as a single list
-    return multiple_artistsId + read_moreId + null_ids
+    return df['id'].to_numpy()[codes != BIO_OK].tolist()
 
 
 def getWrongMusic(df, wrong_ids):
@@ -230,20 +266,28 @@ def remove_lastfm_artist_name(artistcsv):
         print(f"'lastfm_artist_name' column removed from {artistcsv}.")
     
 def connectArtistSong(artistcsv, songcsv):
-    df_artist = pd.read_csv(artistcsv)
-    df_song = pd.read_csv(songcsv)
+    df_artist = load_artist_table(artistcsv)
+    df_song = load_song_table(songcsv)
+
+    # join on integer codes of one shared set of artist names instead of the strings
+    names = pd.Index(df_artist['artist'].dropna().unique())
+    song_codes = pd.Categorical(df_song['artist'], categories=names).codes
+    artist_codes = pd.Categorical(df_artist['artist'], categories=names).codes
+    right = pd.DataFrame({'_artist_code': artist_codes, 'id': df_artist['id'].to_numpy()})
+    right = right[right['_artist_code'] >= 0]
 
     merged_df = pd.merge(
-        df_song,
-        df_artist[['id', 'artist']],
-        on='artist', 
+        df_song.drop(columns=['artist']).assign(_artist_code=song_codes),
+        right,
+        on='_artist_code',
         how='left'
     )
 
-    merged_df.drop(columns=['artist'], inplace=True)
+    merged_df.drop(columns=['_artist_code'], inplace=True)
     merged_df.rename(columns={'id': 'artist_id'}, inplace=True)
 
-    return merged_df
+    # songs without a matching artist leave gaps, so artist_id becomes nullable Int32
+    return compact_dtypes(merged_df, ids=['artist_id'])
 
 def removeLinkToSong(df):
     if 'link' in df.columns:
@@ -276,6 +320,7 @@ def plot_short_string_values(df: pd.DataFrame, column: str, min_len: int = 4):
 
     value_counts = short_values.value_counts()
 
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(6, 4))
     value_counts.plot(kind='bar', color='skyblue', edgecolor='black')
     plt.title(f"Valores com len < {min_len} na coluna '{column}'")
@@ -295,6 +340,7 @@ def plot_top_frequent_strings(df, column: str, top_n: int = 10):
         print(f"Nenhum valor válido encontrado na coluna '{column}'.")
         return
 
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(8, 5))
     value_counts.plot(kind='bar', color='steelblue', edgecolor='black')
     plt.title(f"Top {top_n} strings mais frequentes em '{column}'")
@@ -305,37 +351,47 @@ def plot_top_frequent_strings(df, column: str, top_n: int = 10):
     plt.show()
 
 
-def process_artistData(artist, col='artist_bio'):
+def _clean_artists(artist, col='artist_bio'):
     if "lastfm_artist_name" in artist.columns:
-        artist.rename(columns={'lastfm_artist_name': 'artist_name'}, inplace=True)
+        artist = artist.rename(columns={'lastfm_artist_name': 'artist_name'})
     if "lastfm_artist_bio" in artist.columns:
-        artist.rename(columns={'lastfm_artist_bio': 'artist_bio'}, inplace=True)
+        artist = artist.rename(columns={'lastfm_artist_bio': 'artist_bio'})
+
+    # one pass finds the bad bios and strips "Read more on Last.fm" from the rest
+    codes, cleaned = classify_artist_bios(artist[col])
+    keep = codes == BIO_OK
+    wrong_ids = artist['id'].to_numpy()[~keep]
+    kept = artist[keep].copy()
+    kept[col] = cleaned[keep]
+    return kept, wrong_ids, codes
+
 
-    multiple_artistsId, read_moreId, null_ids = getWrongArtistBios(artist,col=col)
-    wrong_ids = multiple_artistsId + read_moreId + null_ids
-    print(len(multiple_artistsId), len(read_moreId), len(null_ids))
-    print(f"Antes: {len(artist)} artistas")
+def process_artistData(artist, col='artist_bio'):
+    n_before = len(artist)
+    artist, wrong_ids, codes = _clean_artists(artist, col)
+    print(*count_bio_problems(codes).values())
+    print(f"Antes: {n_before} artistas")
     print(f"A remover: {len(wrong_ids)} artistas problemáticos")
-    artist = artist[~artist['id'].isin(wrong_ids)]
     print(f"Depois: {len(artist)} artistas")
 
-    artist['artist_bio'] = artist['artist_bio'].str.replace(r'\s*Read more on Last\.fm.*$', '', regex=True, case=False)
-
     return artist,wrong_ids
 
+# album_name values (besides null) that mean the song has no album
+_NO_ALBUM_VALUES = ['Single', 'No album name']
+
+
+def _normalize_song_columns(song):
+    song = song.rename(columns={"lastfm_album_name": "album_name"})
+    song = song.drop(columns=["lastfm_release_date", "lastfm_track_description", "link"], errors="ignore")
+
+    # null, 'Single' and 'No album name' all become 'No Album' in a single pass
+    album = song['album_name']
+    song['album_name'] = album.mask(album.isna() | album.isin(_NO_ALBUM_VALUES), 'No Album')
+    return song
+
+
 def process_songData(song, wrong_ids):
-    if "lastfm_album_name" in song.columns:
-        song.rename(columns={"lastfm_album_name": "album_name"}, inplace=True)
-    if "lastfm_release_date" in song.columns:
-        song.drop(columns=["lastfm_release_date"], inplace=True)
-    if "lastfm_track_description" in song.columns:
-        song.drop(columns=["lastfm_track_description"], inplace=True)
-    if "link" in song.columns:
-        song.drop(columns=["link"], inplace=True)
-    
-    song['album_name'].fillna('Single', inplace=True)
-    song['album_name'].replace('Single', 'No Album', inplace=True)
-    song['album_name'].replace('No album name', 'No Album', inplace=True)
+    song = _normalize_song_columns(song)
 
     song = song[~song['artist_id'].isin(wrong_ids)]
     
@@ -351,14 +407,69 @@ def process_albumData(song):
     return song
 
 
-def process_dataFinal(artist,song):
+def process_dataFinal(artist,song, artist_out=None, song_out=None):
+    """
+    Clean the artist and song tables. When `artist_out`/`song_out` are given the
+    results are also saved there, as CSV or Parquet depending on the extension.
+    """
     artist,wrong_id=process_artistData(artist)
     song=process_songData(song,wrong_id)
 
+    if artist_out:
+        write_table(artist, artist_out)
+    if song_out:
+        write_table(song, song_out)
+
     return artist,song
 
-import pandas as pd
-import matplotlib.pyplot as plt
+
+def process_dataFinal_chunked(artist_path, song_path, artist_out, song_out, chunksize=50_000):
+    """
+    Streaming version of process_dataFinal for files that do not fit in memory.
+
+    Reads the artist and song tables (CSV or ".parquet") `chunksize` rows at a
+    time, applies the same cleaning as process_artistData/process_songData and
+    appends each cleaned chunk to `artist_out`/`song_out`. Only the ids of the
+    removed artists are kept between chunks, as a sorted NumPy array, so peak
+    memory depends on the chunk size and not on the lyrics volume.
+    Returns a dict with the row counts before and after cleaning.
+    """
+    counts = {"artists_in": 0, "artists_out": 0, "songs_in": 0, "songs_out": 0}
+
+    remove_table(artist_out)
+    artists_writer = TableAppender(artist_out)
+    wrong_parts = []
+    try:
+        for chunk in iter_table(artist_path, chunksize):
+            kept, wrong_ids, _ = _clean_artists(chunk)
+            wrong_parts.append(wrong_ids)
+            artists_writer.append(kept)
+            counts["artists_in"] += len(chunk)
+            counts["artists_out"] += len(kept)
+    finally:
+        artists_writer.close()
+    wrong_ids = np.unique(np.concatenate(wrong_parts)) if wrong_parts else np.array([])
+
+    remove_table(song_out)
+    songs_writer = TableAppender(song_out)
+    next_id = 1
+    try:
+        for chunk in iter_table(song_path, chunksize):
+            counts["songs_in"] += len(chunk)
+            song = _normalize_song_columns(chunk)
+            song = song[~np.isin(song['artist_id'].to_numpy(), wrong_ids)]
+            # song ids keep counting across chunks
+            if "id" not in song.columns:
+                song.insert(0, 'id', range(next_id, next_id + len(song)))
+                next_id += len(song)
+            songs_writer.append(song)
+            counts["songs_out"] += len(song)
+    finally:
+        songs_writer.close()
+
+    print(f"Artistas: {counts['artists_in']} -> {counts['artists_out']}")
+    print(f"Músicas: {counts['songs_in']} -> {counts['songs_out']}")
+    return counts
 
 def getDataAnal(music, artists):
     song_counts = music.groupby('artist_id').size().reset_index(name='num_songs')
@@ -371,6 +482,7 @@ def getDataAnal(music, artists):
     top_artists = artist_song_counts.head(X)
 
 
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(14, 8))
     plt.barh(top_artists['artist_name'], top_artists['num_songs'])
     plt.xlabel('Número de músicas')
@@ -380,164 +492,90 @@ def getDataAnal(music, artists):
     plt.tight_layout()
     plt.show()
 
-import matplotlib
-matplotlib.use('Agg') 
-import matplotlib.pyplot as plt
 
-from wordcloud import WordCloud, STOPWORDS
 
+def wordcloud_stopwords():
+    """STOPWORDS do wordcloud mais as palavras sem significado temático de term_utils."""
+    from wordcloud import STOPWORDS
 
-def create_lyrics_wordcloud(csv_path, text_column='lyrics', output_file='lyrics_wordcloud.png'):
-    """
-    Create and display a word cloud from the song lyrics column in a CSV file.
-    """
-    # Load CSV
-    df = pd.read_csv(csv_path)
-    
-    # Combine all lyrics into one string
-    text = " ".join(str(lyric) for lyric in df[text_column].dropna())
-    
-    # Define stopwords
-    stopwords = set(STOPWORDS)
-    stopwords.update([
-        # Verbos auxiliares
-        "am", "is", "are", "was", "be", "been", "being",
-        "do", "does", "did", "doing",
-        "have", "has", "had", "having",
-
-        # Verbos muito genéricos / comuns em narrativas
-        "put", "keep", "hold", "leave", "bring",
-        "move", "run", "walk", "stand", "sit",
-        "turn", "start", "stop", "work", "live",
-        "look", "watch", "hear", "listen",
-        "talk", "speak", "call", "try", "tryin",
-        "help", "show", "find", "found",
-        "lose", "lost", "stay", "play",
-        "keep", "kept",
-
-        # Verbos modais
-        "can", "cant", "could", "couldnt",
-        "should", "shouldnt", "would", "wouldnt",
-        "may", "might", "must",
-
-        # Verbos de estado genéricos
-        "feel", "felt", "seem", "seemed",
-        "happen", "happens",
-
-        # Contractions comuns
-        "dont", "doesnt", "didnt",
-        "isnt", "arent", "wasnt", "werent",
-        "havent", "hasnt", "hadnt",
-        "cant", "couldnt", "shouldnt",
-        "wouldnt", "imma",
-
-        # Palavras funcionais adicionais (não tem significado temático)
-        "into", "onto", "upon", "through",
-        "while", "without", "within",
-        "cause", "cuz", "cos", "because",
-        "maybe", "really", "just", "only",
-
-        # Fillers comuns em música
-        "ya", "yall", "huh", "hmm", "hahaha",
-        "whoa", "woah", "uhhuh", "nah",
-
-        # Tempo genérico (sem eliminar temas como "night" ou "morning")
-        "time", "times", "moment",
-    ])
+    return set(STOPWORDS) | EXTRA_STOPWORDS
+
+
+def _save_wordcloud(counter, title, output_file):
+    from wordcloud import WordCloud
 
-    
-    # Generate word cloud
     wordcloud = WordCloud(width=1000, height=600,
                           background_color='white',
-                          stopwords=stopwords,
-                          collocations=False).generate(text)
-    
+                          collocations=False)
+    wordcloud.generate_from_frequencies(counter.frequencies(wordcloud.max_words))
+
     # Display and save
+    import matplotlib.pyplot as plt
     plt.figure(figsize=(10, 6))
     plt.imshow(wordcloud, interpolation='bilinear')
     plt.axis('off')
-    plt.title('Word Cloud - Song Lyrics', fontsize=16)
-    
+    plt.title(title, fontsize=16)
+
     wordcloud.to_file(output_file)
-    print(f"Saved lyrics word cloud as {output_file}")
+    return wordcloud
 
 
+def create_lyrics_wordcloud(csv_path, text_column='lyrics', output_file='lyrics_wordcloud.png',
+                            chunksize=50_000, max_terms=None):
+    """
+    Create and save a word cloud from the song lyrics column of a CSV/Parquet file.
 
-def create_bio_wordcloud(csv_path, text_column='artist_bio', output_file='bio_wordcloud.png'):
+    The column is read in chunks and counted with term_utils.count_terms;
+    max_terms bounds memory (count-min sketch) on very large corpora.
+    Returns the TermCounter so the counts can be reused.
     """
-    Create and display a word cloud from the artist biography column in a CSV file.
+    counter = count_terms(csv_path, text_column, chunksize=chunksize,
+                          stopwords=wordcloud_stopwords(), max_terms=max_terms)
+    _save_wordcloud(counter, 'Word Cloud - Song Lyrics', output_file)
+    print(f"Saved lyrics word cloud as {output_file}")
+    return counter
+
+
+def create_bio_wordcloud(csv_path, text_column='artist_bio', output_file='bio_wordcloud.png',
+                         chunksize=50_000, max_terms=None):
     """
-    # Load CSV
-    df = pd.read_csv(csv_path)
-    
-    # Combine all bios into one string
-    text = " ".join(str(bio) for bio in df[text_column].dropna())
-    
-    # Define stopwords
-    stopwords = set(STOPWORDS)
-    stopwords.update([
-        # Verbos auxiliares
-        "am", "is", "are", "was", "be", "been", "being",
-        "do", "does", "did", "doing",
-        "have", "has", "had", "having",
-
-        # Verbos muito genéricos / comuns em narrativas
-        "put", "keep", "hold", "leave", "bring",
-        "move", "run", "walk", "stand", "sit",
-        "turn", "start", "stop", "work", "live",
-        "look", "watch", "hear", "listen",
-        "talk", "speak", "call", "try", "tryin",
-        "help", "show", "find", "found",
-        "lose", "lost", "stay", "play",
-        "keep", "kept",
-
-        # Verbos modais
-        "can", "cant", "could", "couldnt",
-        "should", "shouldnt", "would", "wouldnt",
-        "may", "might", "must",
-
-        # Verbos de estado genéricos
-        "feel", "felt", "seem", "seemed",
-        "happen", "happens",
-
-        # Contractions comuns
-        "dont", "doesnt", "didnt",
-        "isnt", "arent", "wasnt", "werent",
-        "havent", "hasnt", "hadnt",
-        "cant", "couldnt", "shouldnt",
-        "wouldnt", "imma",
-
-        # Palavras funcionais adicionais (não tem significado temático)
-        "into", "onto", "upon", "through",
-        "while", "without", "within",
-        "cause", "cuz", "cos", "because",
-        "maybe", "really", "just", "only",
-
-        # Fillers comuns em música
-        "ya", "yall", "huh", "hmm", "hahaha",
-        "whoa", "woah", "uhhuh", "nah",
-
-        # Tempo genérico (sem eliminar temas como "night" ou "morning")
-        "time", "times", "moment",
-    ])
-
-        
-    
-    # Generate word cloud
-    wordcloud = WordCloud(width=1000, height=600,
-                          background_color='white',
-                          stopwords=stopwords,
-                          collocations=False).generate(text)
-    
-    # Display and save
-    plt.figure(figsize=(10, 6))
-    plt.imshow(wordcloud, interpolation='bilinear')
-    plt.axis('off')
-    plt.title('Word Cloud - Artist Bio', fontsize=16)
-    
-    wordcloud.to_file(output_file)
+    Create and save a word cloud from the artist biography column of a CSV/Parquet file.
+
+    Same counting as create_lyrics_wordcloud; returns the TermCounter.
+    """
+    counter = count_terms(csv_path, text_column, chunksize=chunksize,
+                          stopwords=wordcloud_stopwords(), max_terms=max_terms)
+    _save_wordcloud(counter, 'Word Cloud - Artist Bio', output_file)
     print(f"Saved bio word cloud as {output_file}")
-    
-    
-create_lyrics_wordcloud('dataset/song.csv', text_column='song_lyrics')
-create_bio_wordcloud('dataset/artist.csv', text_column='artist_bio')
\ No newline at end of file
+    return counter
+
+
+if __name__ == "__main__":
+    # Word clouds a partir da linha de comandos, ex.:
+    #   python src/data_utils.py wordcloud --lyrics dataset/song.csv --bios dataset/artist.csv
+    import argparse
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    parser = argparse.ArgumentParser(description="Utilitários de dados")
+    sub = parser.add_subparsers(dest="command", required=True)
+    wc = sub.add_parser("wordcloud", help="Gerar word clouds das letras e/ou das bios")
+    wc.add_argument("--lyrics", help="CSV/Parquet com as letras")
+    wc.add_argument("--lyrics-col", default="song_lyrics", help="Coluna com as letras")
+    wc.add_argument("--lyrics-out", default="lyrics_wordcloud.png", help="Imagem de saída das letras")
+    wc.add_argument("--bios", help="CSV/Parquet com as bios dos artistas")
+    wc.add_argument("--bios-col", default="artist_bio", help="Coluna com as bios")
+    wc.add_argument("--bios-out", default="bio_wordcloud.png", help="Imagem de saída das bios")
+    wc.add_argument("--chunksize", type=int, default=50_000, help="Linhas lidas de cada vez")
+    wc.add_argument("--max-terms", type=int, help="Limitar a memória a este número de termos (count-min sketch)")
+    args = parser.parse_args()
+
+    if not (args.lyrics or args.bios):
+        parser.error("indique --lyrics e/ou --bios")
+    if args.lyrics:
+        create_lyrics_wordcloud(args.lyrics, text_column=args.lyrics_col, output_file=args.lyrics_out,
+                                chunksize=args.chunksize, max_terms=args.max_terms)
+    if args.bios:
+        create_bio_wordcloud(args.bios, text_column=args.bios_col, output_file=args.bios_out,
+                             chunksize=args.chunksize, max_terms=args.max_terms)
\ No newline at end of file
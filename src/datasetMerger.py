@@ -1,14 +1,19 @@
-import pandas as pd
+from storage_utils import read_table, write_table
 
-# Load the data
-artists = pd.read_csv('./finalDataset/artist.csv')
-songs = pd.read_csv('./finalDataset/song.csv')
+# Any of these paths can end in ".parquet" to use Parquet instead of CSV
+ARTISTS_PATH = './finalDataset/artist.csv'
+SONGS_PATH = './finalDataset/song.csv'
+OUTPUT_PATH = './finalDataset/dataset.csv'
+
+# Load the data (only the columns the final dataset needs)
+artists = read_table(ARTISTS_PATH, columns=['artist_id', 'artist_name', 'artist_bio'])
+songs = read_table(SONGS_PATH, columns=['song_id', 'song_name', 'song_lyrics', 'album_name', 'artist_id'])
 
 # Merge the DataFrames based on the artist_id (or whatever the common key is)
-merged_df = pd.merge(songs, artists, how='left', left_on='artist_id', right_on='artist_id')
+merged_df = songs.merge(artists, how='left', left_on='artist_id', right_on='artist_id')
 
 # Create the final DataFrame with the relevant columns
 final_df = merged_df[['song_id', 'song_name', 'song_lyrics', 'album_name', 'artist_name', 'artist_bio']]
 
-# Save to CSV
-final_df.to_csv('./finalDataset/dataset.csv', index=False)
\ No newline at end of file
+# Save to CSV (or Parquet)
+write_table(final_df, OUTPUT_PATH)
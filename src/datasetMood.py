@@ -0,0 +1,11 @@
+from sentiment_utils import add_mood_fields
+
+# Runs after datasetMerger.py: adds the numeric mood fields (polarity and
+# emotion_*) that the Solr schemas index, so queries can filter/boost by mood.
+# The output is the file load_files_solr.py indexes (./dataset is mounted in the container)
+DATASET_PATH = './finalDataset/dataset.csv'
+OUTPUT_PATH = './dataset/dataset_mood.csv'
+SCORE_CACHE = './finalDataset/scores.sqlite'
+
+fields = add_mood_fields(DATASET_PATH, OUTPUT_PATH, text_column='song_lyrics', score_cache=SCORE_CACHE)
+print(f"Added fields {fields} -> {OUTPUT_PATH}")
@@ -10,14 +10,24 @@ API root: http://ws.audioscrobbler.com/2.0/
 """
 
 import requests
+import requests.adapters
+import random
 import time
 import html
 import re
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List
 import os
 import json
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 
+from storage_utils import TableAppender, remove_table, with_suffix
+
 API_ROOT = "http://ws.audioscrobbler.com/2.0/"
 
 
@@ -35,30 +45,237 @@ def _clean_html(text: Optional[str]) -> str:
 	return html.unescape(clean).strip()
 
 
-def _safe_request(params: Dict[str, Any], retries: int = 3, delay: float = 1.0) -> Optional[Dict[str, Any]]:
+# ------------------ HTTP client ------------------
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.RLock()
+_stats: Dict[str, Dict[str, float]] = {}
+_stats_lock = threading.Lock()
+
+
+def configure_session(pool_size: int = 10) -> requests.Session:
+	"""(Re)create the shared keep-alive session used for every Last.fm call.
+
+	`pool_size` is the number of pooled connections kept open to the API host;
+	it should be at least the number of worker threads issuing requests.
+	"""
+	global _session
+	session = requests.Session()
+	adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+	session.mount("http://", adapter)
+	session.mount("https://", adapter)
+	session.headers.update({"Accept-Encoding": "gzip, deflate"})
+	with _session_lock:
+		old, _session = _session, session
+	if old is not None:
+		old.close()
+	return session
+
+
+def _get_session() -> requests.Session:
+	if _session is None:
+		with _session_lock:
+			if _session is None:
+				configure_session()
+	return _session
+
+
+def _backoff_delay(attempt: int, base: float, max_delay: float) -> float:
+	"""Exponential backoff with full jitter: uniform in [0, base * 2**(attempt-1)]."""
+	return random.uniform(0, min(max_delay, base * (2 ** (attempt - 1))))
+
+
+def _endpoint_stats(method: str) -> Dict[str, float]:
+	# caller must hold _stats_lock
+	return _stats.setdefault(method, {"calls": 0, "cache_hits": 0, "errors": 0, "retries": 0, "total_latency": 0.0, "max_latency": 0.0})
+
+
+def _record_hit(method: str) -> None:
+	with _stats_lock:
+		st = _endpoint_stats(method)
+		st["cache_hits"] += 1
+
+
+def _record(method: str, latency: float, retries: int, ok: bool) -> None:
+	with _stats_lock:
+		st = _endpoint_stats(method)
+		st["calls"] += 1
+		st["retries"] += retries
+		st["total_latency"] += latency
+		st["max_latency"] = max(st["max_latency"], latency)
+		if not ok:
+			st["errors"] += 1
+
+
+def get_request_stats() -> Dict[str, Dict[str, float]]:
+	"""Return per-endpoint call counts, failures, retries and latency (seconds).
+
+	Latency covers the whole call, retries and backoff included. Requests
+	answered by the response cache only count towards `cache_hits`.
+	"""
+	with _stats_lock:
+		report = {}
+		for method, st in _stats.items():
+			entry = dict(st)
+			entry["avg_latency"] = st["total_latency"] / st["calls"] if st["calls"] else 0.0
+			report[method] = entry
+		return report
+
+
+def reset_request_stats() -> None:
+	with _stats_lock:
+		_stats.clear()
+
+
+def print_request_stats() -> None:
+	for method, st in sorted(get_request_stats().items()):
+		print(
+			f"{method}: {int(st['calls'])} calls, {int(st['cache_hits'])} cached, {int(st['errors'])} failed, {int(st['retries'])} retries, "
+			f"avg {st['avg_latency']:.3f}s, max {st['max_latency']:.3f}s"
+		)
+
+
+class _ResponseCache:
+	"""On-disk SQLite store of raw Last.fm responses.
+
+	Entries are keyed by a hash of the API method and its normalized params
+	(see `_cache_key`). Entries older than `ttl` seconds are treated as misses,
+	and once the store grows past `max_entries` the least recently used
+	entries are evicted.
+	"""
+
+	def __init__(self, path: str, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+		if os.path.dirname(path):
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+		self.path = path
+		self.ttl = ttl
+		self.max_entries = max_entries
+		self._lock = threading.Lock()
+		self._conn = sqlite3.connect(path, check_same_thread=False)
+		self._conn.execute("PRAGMA journal_mode=WAL")
+		self._conn.execute(
+			"CREATE TABLE IF NOT EXISTS responses ("
+			"key TEXT PRIMARY KEY, method TEXT, body TEXT, created REAL, accessed REAL)"
+		)
+		self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+		self._conn.commit()
+		self._size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+	def get(self, key: str) -> Optional[Dict[str, Any]]:
+		now = time.time()
+		with self._lock:
+			row = self._conn.execute("SELECT body, created FROM responses WHERE key = ?", (key,)).fetchone()
+			if row is None:
+				return None
+			if self.ttl is not None and now - row[1] > self.ttl:
+				self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+				self._conn.commit()
+				self._size -= 1
+				return None
+			self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+			self._conn.commit()
+		return json.loads(row[0])
+
+	def put(self, key: str, method: str, data: Dict[str, Any]) -> None:
+		now = time.time()
+		body = json.dumps(data, ensure_ascii=False)
+		with self._lock:
+			cur = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,))
+			is_new = cur.fetchone() is None
+			self._conn.execute(
+				"INSERT OR REPLACE INTO responses (key, method, body, created, accessed) VALUES (?, ?, ?, ?, ?)",
+				(key, method, body, now, now),
+			)
+			if is_new:
+				self._size += 1
+			if self.max_entries is not None and self._size > self.max_entries:
+				excess = self._size - self.max_entries
+				self._conn.execute(
+					"DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+					(excess,),
+				)
+				self._size -= excess
+			self._conn.commit()
+
+	def close(self) -> None:
+		with self._lock:
+			self._conn.close()
+
+
+_response_cache: Optional[_ResponseCache] = None
+
+# Last.fm error codes that are transient and must not be cached
+# (8 operation failed, 11 service offline, 16 temporary error, 29 rate limit)
+_TRANSIENT_API_ERRORS = {8, 11, 16, 29}
+
+
+def configure_response_cache(path: Optional[str], ttl: Optional[float] = None, max_entries: Optional[int] = None) -> None:
+	"""Enable the on-disk response cache at `path`, or disable it with None.
+
+	Once enabled, `_safe_request` answers repeated calls from the cache without
+	touching the network, so re-running the pipeline only pays for new lookups.
+	"""
+	global _response_cache
+	old, _response_cache = _response_cache, (_ResponseCache(path, ttl, max_entries) if path else None)
+	if old is not None:
+		old.close()
+
+
+def _cache_key(params: Dict[str, Any]) -> str:
+	"""Hash the request params, ignoring api_key/format and case/whitespace."""
+	normalized = {
+		k: (str(v).strip().lower() if isinstance(v, str) else v)
+		for k, v in params.items()
+		if k not in ("api_key", "format")
+	}
+	payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+	return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _safe_request(params: Dict[str, Any], retries: int = 3, delay: float = 1.0, max_delay: float = 30.0) -> Optional[Dict[str, Any]]:
 	"""Call the Last.fm API endpoint with provided params and return parsed JSON.
 
 	The params dict should include the 'method' key (e.g. 'track.getInfo').
 	This function adds the api_key and format=json automatically and retries
-	on transient network errors.
+	on transient network errors, waiting an exponentially growing, jittered
+	delay (starting at `delay`, capped at `max_delay`) between attempts.
+	Requests go through the shared pooled session (see `configure_session`),
+	and when a response cache is configured it is checked before the network.
 	"""
 	params = dict(params)
 	params.setdefault("api_key", API_KEY)
 	params.setdefault("format", "json")
+	method = params.get("method", "")
+
+	cache = _response_cache
+	key = _cache_key(params) if cache is not None else None
+	if cache is not None:
+		cached = cache.get(key)
+		if cached is not None:
+			_record_hit(method)
+			return cached
+
+	session = _get_session()
 
+	started = time.perf_counter()
 	for attempt in range(1, retries + 1):
 		try:
-			resp = requests.get(API_ROOT, params=params, timeout=10)
+			resp = session.get(API_ROOT, params=params, timeout=10)
 			if resp.status_code == 200:
-				return resp.json()
+				data = resp.json()
+				_record(method, time.perf_counter() - started, attempt - 1, True)
+				if cache is not None and data.get("error") not in _TRANSIENT_API_ERRORS:
+					cache.put(key, method, data)
+				return data
 			else:
 				print(f"Last.fm API returned status {resp.status_code} (attempt {attempt}/{retries})")
 		except requests.RequestException as e:
 			print(f"Network error contacting Last.fm API: {e} (attempt {attempt}/{retries})")
 
 		if attempt < retries:
-			time.sleep(delay)
+			time.sleep(_backoff_delay(attempt, delay, max_delay))
 
+	_record(method, time.perf_counter() - started, retries - 1, False)
 	return None
 
 
@@ -172,18 +389,243 @@ def get_track_info(track_name: Optional[str] = None, artist_name: Optional[str]
 # ------------------ CSV augmentation helpers ------------------
 
 
-def _save_progress(last_index: int, progress_file: str, cache: Dict[str, Any]):
-	os.makedirs(os.path.dirname(progress_file), exist_ok=True)
-	with open(progress_file, "w", encoding="utf-8") as f:
-		json.dump({"last_index": last_index, "cache": cache}, f, ensure_ascii=False, indent=2)
+def _journal_path(progress_file: str) -> str:
+	return progress_file + ".log"
+
 
+def _save_progress(last_index: int, progress_file: str, cache: Dict[str, Any], generation: int = 0):
+	"""Compact the progress: write a full snapshot and drop the journal.
 
-def _load_progress(progress_file: str) -> Tuple[int, Dict[str, Any]]:
+	The snapshot is written to a temporary file and atomically renamed. It is
+	tagged with `generation`; journal lines from older generations are ignored
+	on load, so a crash between the rename and the journal truncation is safe.
+	"""
+	os.makedirs(os.path.dirname(progress_file), exist_ok=True)
+	tmp_path = progress_file + ".tmp"
+	with open(tmp_path, "w", encoding="utf-8") as f:
+		json.dump({"last_index": last_index, "generation": generation, "cache": cache}, f, ensure_ascii=False)
+	os.replace(tmp_path, progress_file)
+	open(_journal_path(progress_file), "w", encoding="utf-8").close()
+
+
+def _append_progress(
+	last_index: int,
+	progress_file: str,
+	generation: int,
+	cache_delta: Dict[str, Any],
+	written_delta: List[str],
+	id_map_delta: Dict[str, str],
+):
+	"""Append one checkpoint holding only what changed since the previous one."""
+	entry = {"i": last_index, "g": generation, "c": cache_delta, "w": written_delta, "m": id_map_delta}
+	with open(_journal_path(progress_file), "a", encoding="utf-8") as f:
+		f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _load_progress(progress_file: str) -> Tuple[int, Dict[str, Any], int]:
+	"""Return (last_index, cache, generation) from the snapshot plus its journal.
+
+	Snapshots written before the journal existed load as generation 0. A
+	truncated last journal line (crash mid-write) is ignored.
+	"""
+	last_index, cache, generation = 0, {}, 0
 	if os.path.exists(progress_file):
 		with open(progress_file, "r", encoding="utf-8") as f:
 			data = json.load(f)
-			return data.get("last_index", 0), data.get("cache", {})
-	return 0, {}
+			last_index, cache, generation = data.get("last_index", 0), data.get("cache", {}), data.get("generation", 0)
+
+	journal = _journal_path(progress_file)
+	if os.path.exists(journal):
+		written = cache.setdefault("__artists_written__", [])
+		id_map = cache.setdefault("__artist_id_map__", {})
+		with open(journal, "r", encoding="utf-8") as f:
+			for line in f:
+				try:
+					entry = json.loads(line)
+				except json.JSONDecodeError:
+					break
+				if entry.get("g") != generation:
+					continue
+				last_index = entry["i"]
+				cache.update(entry["c"])
+				written.extend(entry["w"])
+				id_map.update(entry["m"])
+	return last_index, cache, generation
+
+
+class _TokenBucket:
+	"""Thread-safe token bucket used to cap the global Last.fm request rate.
+
+	`rate` tokens are added per second up to `capacity`; every API call takes
+	one token and blocks until one is available, no matter which worker thread
+	issues it.
+	"""
+
+	def __init__(self, rate: float, capacity: Optional[float] = None):
+		if rate <= 0:
+			raise ValueError("rate must be positive")
+		self.rate = float(rate)
+		self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+		self._tokens = self.capacity
+		self._last = time.monotonic()
+		self._lock = threading.Lock()
+
+	def acquire(self) -> None:
+		while True:
+			with self._lock:
+				now = time.monotonic()
+				self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+				self._last = now
+				if self._tokens >= 1.0:
+					self._tokens -= 1.0
+					return
+				wait = (1.0 - self._tokens) / self.rate
+			time.sleep(wait)
+
+
+def _unpack_cached_artist(cached: Any, default_name: str) -> Tuple[str, int, str, Optional[str]]:
+	"""Read an artist cache entry, (bio, listeners, name) or extended with id."""
+	if isinstance(cached, (list, tuple)) and len(cached) >= 3:
+		cached_id = cached[3] if len(cached) >= 4 else None
+		return cached[0], cached[1], cached[2], cached_id
+	# unknown cached format: ignore
+	return "", 0, default_name, None
+
+
+def _enrich_row(song: str, artist: str, cache: Dict[str, Any], fetched_artists: Dict[str, Any], throttle) -> Dict[str, Any]:
+	"""Run the Last.fm lookups for a single input row.
+
+	Only reads `cache`; artist id assignment and cache updates are left to the
+	caller so they happen in input order. `fetched_artists` holds artist info
+	fetched during this run so rows in flight at the same time share it.
+	"""
+	throttle()
+	res = search_track(song, artist)
+	if res is None:
+		track_mbid, artist_mbid, track_name, artist_name = None, None, song, artist
+	else:
+		track_mbid, artist_mbid, track_name, artist_name = res
+
+	cache_key = (artist_name or artist).lower()
+	cached = cache.get(cache_key) or fetched_artists.get(cache_key)
+	if cached:
+		artist_bio, artist_listeners, artist_name_clean, cached_artist_id = _unpack_cached_artist(cached, artist_name or artist or "")
+	else:
+		throttle()
+		artist_info = get_artist_info(artist_name=artist_name or artist, artist_mbid=artist_mbid)
+		if artist_info is None:
+			artist_bio, artist_listeners, artist_name_clean = "", 0, artist_name or artist or ""
+		else:
+			artist_bio, artist_listeners, artist_name_clean = artist_info
+		fetched_artists[cache_key] = (artist_bio, artist_listeners, artist_name_clean)
+		# no id yet; the caller assigns it
+		cached_artist_id = None
+
+	throttle()
+	track_info = get_track_info(track_name=track_name, artist_name=artist_name_clean, track_mbid=track_mbid)
+	if track_info is None:
+		track_description, release_date, album_mbid, album_name = "", None, 0, ""
+	else:
+		track_description, release_date, album_mbid, album_name = track_info
+
+	return {
+		"cache_key": cache_key,
+		"artist_bio": artist_bio,
+		"artist_listeners": artist_listeners,
+		"artist_name_clean": artist_name_clean,
+		"cached_artist_id": cached_artist_id,
+		"track_description": track_description,
+		"release_date": release_date,
+		"album_name": album_name,
+	}
+
+
+def _first_nonempty(*vals) -> str:
+	"""Return the first value that is not None/NaN/blank, as a stripped string."""
+	for v in vals:
+		if v is None:
+			continue
+		try:
+			if pd.isna(v):
+				continue
+		except Exception:
+			pass
+		s = str(v).strip()
+		if s:
+			return s
+	return ""
+
+
+def _row_song_artist(row) -> Tuple[str, str]:
+	# ler colunas de forma robusta a NaN
+	return _first_nonempty(row.get("song"), row.get("track")), _first_nonempty(row.get("artist"))
+
+
+def _normalize_name(name: Optional[str]) -> str:
+	"""Fold case, unicode forms, '&' and punctuation so spelling variants share a key.
+
+	e.g. "AC/DC", "ac dc" and "Ac-Dc" all map to "ac dc". Names made only of
+	punctuation keep their case-folded form.
+	"""
+	if not name:
+		return ""
+	folded = unicodedata.normalize("NFKC", name).casefold().strip()
+	key = re.sub(r"[\W_]+", " ", folded.replace("&", " and ")).strip()
+	return key or folded
+
+
+def _plan_enrichment(csv_path: str, chunk_size: int, start_index: int = 0) -> Tuple[Dict[str, str], Counter, Counter]:
+	"""Scan the input once and collect the distinct entities to look up.
+
+	Returns (artist_names, artist_counts, pair_counts): `artist_names` maps each
+	normalized artist to the first spelling seen, and the counters hold how many
+	rows from `start_index` on refer to each artist and (artist, track) pair.
+	"""
+	artist_names: Dict[str, str] = {}
+	artist_counts: Counter = Counter()
+	pair_counts: Counter = Counter()
+	global_index = 0
+	reader = pd.read_csv(csv_path, chunksize=chunk_size, iterator=True, dtype=str, encoding="utf-8")
+	for chunk in reader:
+		n = len(chunk)
+		start_in_chunk = max(0, start_index - global_index)
+		global_index += n
+		if start_in_chunk >= n:
+			continue
+		for i in range(start_in_chunk, n):
+			song, artist = _row_song_artist(chunk.iloc[i])
+			artist_key = _normalize_name(artist)
+			artist_names.setdefault(artist_key, artist)
+			artist_counts[artist_key] += 1
+			pair_counts[(artist_key, _normalize_name(song))] += 1
+	return artist_names, artist_counts, pair_counts
+
+
+def _fetch_artist_entry(artist: str, throttle) -> Tuple[str, int, str]:
+	"""Look up one planned artist by its input name; returns (bio, listeners, name)."""
+	throttle()
+	artist_info = get_artist_info(artist_name=artist)
+	if artist_info is None:
+		return "", 0, artist
+	return artist_info
+
+
+def _fetch_track_entry(song: str, artist: str, artist_name_clean: str, throttle) -> Dict[str, Any]:
+	"""Look up one planned (artist, track) pair: track search then track info."""
+	throttle()
+	res = search_track(song, artist)
+	if res is None:
+		track_mbid, track_name = None, song
+	else:
+		track_mbid, _, track_name, _ = res
+
+	throttle()
+	track_info = get_track_info(track_name=track_name, artist_name=artist_name_clean, track_mbid=track_mbid)
+	if track_info is None:
+		track_description, release_date, album_mbid, album_name = "", None, 0, ""
+	else:
+		track_description, release_date, album_mbid, album_name = track_info
+	return {"track_description": track_description, "release_date": release_date, "album_name": album_name}
 
 
 def augment_csv_with_lastfm(
@@ -194,6 +636,11 @@ def augment_csv_with_lastfm(
     progress_file: str = "processData/lastfm_progress.json",
     overwrite: bool = False,
     sleep_between_calls: float = 0.2,
+    max_workers: int = 1,
+    requests_per_second: Optional[float] = None,
+    response_cache_path: Optional[str] = None,
+    compact_every: int = 50,
+    plan_entities: bool = False,
 ) -> None:
     """Augment the input CSV with Last.fm fields and write to out_csv_path.
 
@@ -213,19 +660,44 @@ def augment_csv_with_lastfm(
 
 	The function supports resuming using `progress_file` which stores the last
 	processed row index and a small cache for artist info to avoid repeated
+	API calls. Checkpoints only append what changed to a journal next to it
+	(`progress_file` + ".log"); every `compact_every` checkpoints and at the
+	end of the run the journal is folded back into `progress_file`.
+
+	With `max_workers` > 1 the rows of each chunk are looked up by a thread
+	pool, keeping up to `max_workers` rows in flight. All workers share one
+	token bucket of `requests_per_second` (default 1 / `sleep_between_calls`)
+	instead of sleeping between calls. Artist ids, the cache and both outputs
+	are still updated in input order, so output and resume are identical to
+	the sequential mode.
+
+	With `plan_entities` the input is first scanned once to collect the
+	distinct artists and (artist, track) pairs, keyed by `_normalize_name` so
+	case and punctuation variants collapse. Each artist is then looked up once
+	by its input name (no track search needed first) and each pair once, and
+	the results are joined back onto the rows chunk by chunk. The number of API
+	calls is proportional to distinct entities rather than rows. Pair results
+	are dropped once their last row has been written.
+
+	If `out_csv_path` ends in ".parquet" both outputs are written as Parquet
+	datasets instead (see `storage_utils.TableAppender`), one row group per
+	chunk, so later stages can reload them, or just some columns, quickly.
+
+	`response_cache_path` enables the on-disk response cache (see
+	`configure_response_cache`), so a re-run over already seen rows makes no
 	API calls.
 	"""
     if out_csv_path is None:
         out_csv_path = csv_path.replace(".csv", "_with_lastfm.csv")
     # two outputs: songs and artists
     songs_out_path = out_csv_path
-    artists_out_path = out_csv_path.replace('.csv', '_artists.csv')
+    artists_out_path = with_suffix(out_csv_path, '_artists')
 
-    if overwrite and os.path.exists(out_csv_path):
-        os.remove(out_csv_path)
+    if overwrite:
+        remove_table(out_csv_path)
 
     os.makedirs(os.path.dirname(progress_file), exist_ok=True)
-    last_index_saved, cache = _load_progress(progress_file)
+    last_index_saved, cache, generation = _load_progress(progress_file)
     if last_index_saved > start_index:
         start_index = last_index_saved
 
@@ -237,15 +709,14 @@ def augment_csv_with_lastfm(
 
     reader = pd.read_csv(csv_path, chunksize=chunk_size, iterator=True, dtype=str, encoding="utf-8")
 
-    # song output write control
-    first_write = True
-    # artist output write control
-    first_write_art = True
+    # song and artist outputs (CSV appends or Parquet row groups)
+    songs_out = TableAppender(songs_out_path)
+    artists_out = TableAppender(artists_out_path)
     # track which artist ids have already been written to artists_out
     artists_written = set(cache.get('__artists_written__', []))
 
     # artist id mapping persisted in cache under key '__artist_id_map__'
-    artist_id_map = cache.get('__artist_id_map__', {})
+    artist_id_map = cache.setdefault('__artist_id_map__', {})
     # determine starting counter for generated ids
     def _max_id(map_dict):
         mx = 0
@@ -258,167 +729,247 @@ def augment_csv_with_lastfm(
                 pass
         return mx
     artist_id_counter = max(_max_id(artist_id_map) + 1, 1)
-    processed = 0
     global_index = 0
 
-    for chunk in reader:
-        n = len(chunk)
-        if global_index + n <= start_index:
-            global_index += n
-            continue
+    # changes since the last checkpoint, appended to the progress journal
+    dirty_keys = set()
+    new_written = []
+    new_ids = {}
+    checkpoints = 0
+
+    def _checkpoint(last_index):
+        nonlocal checkpoints, generation
+        checkpoints += 1
+        if checkpoints % compact_every == 0:
+            cache['__artists_written__'] = sorted(artists_written)
+            generation += 1
+            _save_progress(last_index, progress_file, cache, generation)
+        else:
+            _append_progress(last_index, progress_file, generation, {k: cache[k] for k in dirty_keys}, list(new_written), dict(new_ids))
+        dirty_keys.clear()
+        new_written.clear()
+        new_ids.clear()
+
+    configure_session(pool_size=max(max_workers, 1))
+    if response_cache_path:
+        configure_response_cache(response_cache_path)
+    reset_request_stats()
+
+    # sequential mode sleeps between calls; concurrent mode shares a token bucket
+    if max_workers > 1:
+        rate = requests_per_second or (1.0 / sleep_between_calls if sleep_between_calls else None)
+        bucket = _TokenBucket(rate) if rate else None
+        throttle = bucket.acquire if bucket else (lambda: None)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+    else:
+        def throttle():
+            if sleep_between_calls:
+                time.sleep(sleep_between_calls)
+        executor = None
+
+    # artist info fetched during this run, shared by rows in flight
+    fetched_artists: Dict[str, Any] = {}
+
+    def _fetch(song_artist):
+        try:
+            return _enrich_row(song_artist[0], song_artist[1], cache, fetched_artists, throttle)
+        except Exception as e:
+            return e
+
+    def _run(fn, items):
+        # map keeps input order in both modes
+        return executor.map(fn, items) if executor else map(fn, items)
+
+    if plan_entities:
+        artist_names, artist_counts, pair_counts = _plan_enrichment(csv_path, chunk_size, start_index)
+        print(
+            f"Enrichment plan: {sum(pair_counts.values())} rows, {len(artist_counts)} distinct artists, "
+            f"{len(pair_counts)} distinct tracks"
+        )
+        # per-pair results, kept until the last row using them is written
+        track_entries: Dict[Tuple[str, str], Any] = {}
+
+        def _fetch_artist(artist_key):
+            try:
+                return _fetch_artist_entry(artist_names[artist_key], throttle)
+            except Exception as e:
+                return e
 
-        start_in_chunk = max(0, start_index - global_index)
-        end_in_chunk = n
+        def _fetch_track(item):
+            (song, artist), artist_name_clean = item
+            try:
+                return _fetch_track_entry(song, artist, artist_name_clean, throttle)
+            except Exception as e:
+                return e
 
-        # helper para escolher o primeiro valor não vazio/não-NaN
-        def _first_nonempty(*vals):
-            for v in vals:
-                if v is None:
-                    continue
-                try:
-                    if pd.isna(v):
-                        continue
-                except Exception:
-                    pass
-                s = str(v).strip()
-                if s:
-                    return s
-            return ""
-
-        new_rows = []
-        new_artist_rows = []
-        for i in range(start_in_chunk, end_in_chunk):
-            row = chunk.iloc[i]
-            idx = global_index + i
-
-            # ler colunas de forma robusta a NaN
-            song = _first_nonempty(row.get("song"), row.get("track"))
-            artist = _first_nonempty(row.get("artist"))
+        def _planned_results(inputs):
+            keys = [(_normalize_name(artist), _normalize_name(song)) for song, artist in inputs]
 
-            try:
-                if sleep_between_calls:
-                    time.sleep(sleep_between_calls)
-                res = search_track(song, artist)
-                if res is None:
-                    track_mbid = None
-                    artist_mbid = None
-                    track_name = song
-                    artist_name = artist
-                else:
-                    track_mbid, artist_mbid, track_name, artist_name = res
-
-                cache_key = (artist_name or artist).lower()
-                cached = cache.get(cache_key)
-                artist_bio = ""
-                artist_listeners = 0
-                artist_name_clean = artist_name or artist or ""
-                cached_artist_id = None
+            # artists not known from the progress cache or an earlier chunk
+            todo_artists = list(dict.fromkeys(
+                k for k, _ in keys if not cache.get(k) and k not in fetched_artists
+            ))
+            for artist_key, entry in zip(todo_artists, _run(_fetch_artist, todo_artists)):
+                fetched_artists[artist_key] = entry
+
+            def _artist_entry(artist_key):
+                cached = cache.get(artist_key)
                 if cached:
-                    # handle previous tuple formats (bio,listeners,name) or extended with id
-                    try:
-                        if isinstance(cached, (list, tuple)) and len(cached) >= 3:
-                            artist_bio, artist_listeners, artist_name_clean = cached[0], cached[1], cached[2]
-                            if len(cached) >= 4:
-                                cached_artist_id = cached[3]
-                        else:
-                            # unknown cached format: ignore
-                            pass
-                    except Exception:
-                        pass
+                    return _unpack_cached_artist(cached, artist_names.get(artist_key, ""))
+                entry = fetched_artists[artist_key]
+                return entry if isinstance(entry, Exception) else (*entry, None)
+
+            todo_pairs = {}
+            for key, song_artist in zip(keys, inputs):
+                if key not in track_entries and key not in todo_pairs:
+                    todo_pairs[key] = song_artist
+            track_items = []
+            for key, song_artist in todo_pairs.items():
+                artist_entry = _artist_entry(key[0])
+                name_clean = song_artist[1] if isinstance(artist_entry, Exception) else artist_entry[2]
+                track_items.append((song_artist, name_clean))
+            for key, entry in zip(todo_pairs, _run(_fetch_track, track_items)):
+                track_entries[key] = entry
+
+            results = []
+            for key in keys:
+                artist_entry = _artist_entry(key[0])
+                track_entry = track_entries[key]
+                pair_counts[key] -= 1
+                if pair_counts[key] <= 0:
+                    del track_entries[key]
+                if isinstance(artist_entry, Exception):
+                    results.append(artist_entry)
+                elif isinstance(track_entry, Exception):
+                    results.append(track_entry)
                 else:
-                    if sleep_between_calls:
-                        time.sleep(sleep_between_calls)
-                    artist_info = get_artist_info(artist_name=artist_name or artist, artist_mbid=artist_mbid)
-                    if artist_info is None:
-                        artist_bio, artist_listeners, artist_name_clean = "", 0, artist_name or artist or ""
-                    else:
-                        artist_bio, artist_listeners, artist_name_clean = artist_info
-                    # no id yet; will set below
-                    cached_artist_id = None
-
-                # determine artist id: prefer input id columns if present, then cached id, else mapping
-                input_artist_id = None
-                for cand in ('artist_id', 'id'):
-                    try:
-                        v = row.get(cand)
-                        if v is not None and str(v).strip():
-                            input_artist_id = str(v).strip()
-                            break
-                    except Exception:
-                        pass
-
-                if input_artist_id:
-                    artist_id_final = input_artist_id
-                elif cached_artist_id:
-                    artist_id_final = str(cached_artist_id)
-                else:
-                    # try map by cleaned name
-                    name_key = artist_name_clean.lower().strip()
-                    if name_key in artist_id_map:
-                        artist_id_final = str(artist_id_map[name_key])
-                    else:
-                        artist_id_final = str(artist_id_counter)
-                        artist_id_counter += 1
-                        artist_id_map[name_key] = artist_id_final
-
-                # update cache with extended info including id
-                cache[cache_key] = (artist_bio, artist_listeners, artist_name_clean, artist_id_final)
-
-                if sleep_between_calls:
-                    time.sleep(sleep_between_calls)
-                track_info = get_track_info(track_name=track_name, artist_name=artist_name_clean, track_mbid=track_mbid)
-                if track_info is None:
-                    track_description, release_date, album_mbid, album_name = "", None, 0, ""
-                else:
-                    track_description, release_date, album_mbid, album_name = track_info
-
-                # Build only LASTFM columns for songs output (avoid duplicating artist/song/link/text)
-                new_rows.append({
-                    "lastfm_track_description": track_description,
-                    "lastfm_release_date": release_date,
-                    "lastfm_album_name": album_name,
-                })
-
-                # prepare artist row (unique)
-                artist_record = {
-                    "id": artist_id_final,
-                    "artist": artist_name_clean or artist,
-                    "lastfm_artist": artist_name_clean or artist,
-                    "lastfm_artist_bio": artist_bio,
-                }
-                # only add to new_artist_rows if not already written or seen in this chunk
-                if artist_id_final not in artists_written:
-                    new_artist_rows.append(artist_record)
-                    artists_written.add(artist_id_final)
+                    artist_bio, artist_listeners, artist_name_clean, cached_artist_id = artist_entry
+                    results.append({
+                        "cache_key": key[0],
+                        "artist_bio": artist_bio,
+                        "artist_listeners": artist_listeners,
+                        "artist_name_clean": artist_name_clean,
+                        "cached_artist_id": cached_artist_id,
+                        **track_entry,
+                    })
+            return results
 
-            except Exception as e:
-                print(f"Error processing row {idx}: {e}")
-                # append empty LASTFM columns on error (keeps column alignment)
-                new_rows.append({c: "" for c in cols_to_add})
+    try:
+        for chunk in reader:
+            n = len(chunk)
+            if global_index + n <= start_index:
+                global_index += n
+                continue
 
-            processed += 1
-            if processed % (chunk_size * 2) == 0:
-                _save_progress(idx + 1, progress_file, cache)
+            start_in_chunk = max(0, start_index - global_index)
+            end_in_chunk = n
 
-        added_df = pd.DataFrame(new_rows, index=chunk.index[start_in_chunk:end_in_chunk])
-        # keep original columns (artist,song,link,text,...) and append only the LASTFM fields
-        out_df = pd.concat([chunk.iloc[start_in_chunk:end_in_chunk].reset_index(drop=True), added_df.reset_index(drop=True)], axis=1)
+            rows = [chunk.iloc[i] for i in range(start_in_chunk, end_in_chunk)]
+            inputs = [_row_song_artist(row) for row in rows]
+            results = _planned_results(inputs) if plan_entities else _run(_fetch, inputs)
 
-        # write songs output
-        out_df.to_csv(songs_out_path, mode='a', header=first_write, index=False, encoding='utf-8')
-        first_write = False
+            new_rows = []
+            new_artist_rows = []
+            for offset, (row, res) in enumerate(zip(rows, results)):
+                idx = global_index + start_in_chunk + offset
+                artist = inputs[offset][1]
 
-        # write new artist rows (unique)
-        if new_artist_rows:
-            art_df = pd.DataFrame(new_artist_rows)
-            art_df.to_csv(artists_out_path, mode='a', header=first_write_art, index=False, encoding='utf-8')
-            first_write_art = False
+                try:
+                    if isinstance(res, Exception):
+                        raise res
+
+                    artist_bio = res["artist_bio"]
+                    artist_listeners = res["artist_listeners"]
+                    artist_name_clean = res["artist_name_clean"]
+                    cached_artist_id = res["cached_artist_id"]
+                    # an earlier row may have assigned the id since this one was fetched
+                    if not cached_artist_id and res["cache_key"] in cache:
+                        cached_artist_id = _unpack_cached_artist(cache[res["cache_key"]], artist_name_clean)[3]
+
+                    # determine artist id: prefer input id columns if present, then cached id, else mapping
+                    input_artist_id = None
+                    for cand in ('artist_id', 'id'):
+                        try:
+                            v = row.get(cand)
+                            if v is not None and str(v).strip():
+                                input_artist_id = str(v).strip()
+                                break
+                        except Exception:
+                            pass
 
-        # persist artist mapping and written set into cache so resume works
-        cache['__artists_written__'] = list(artists_written)
-        cache['__artist_id_map__'] = artist_id_map
+                    if input_artist_id:
+                        artist_id_final = input_artist_id
+                    elif cached_artist_id:
+                        artist_id_final = str(cached_artist_id)
+                    else:
+                        # try map by cleaned name
+                        name_key = artist_name_clean.lower().strip()
+                        if name_key in artist_id_map:
+                            artist_id_final = str(artist_id_map[name_key])
+                        else:
+                            artist_id_final = str(artist_id_counter)
+                            artist_id_counter += 1
+                            artist_id_map[name_key] = artist_id_final
+                            new_ids[name_key] = artist_id_final
+
+                    # update cache with extended info including id
+                    cache[res["cache_key"]] = (artist_bio, artist_listeners, artist_name_clean, artist_id_final)
+                    dirty_keys.add(res["cache_key"])
+
+                    # Build only LASTFM columns for songs output (avoid duplicating artist/song/link/text)
+                    new_rows.append({
+                        "lastfm_track_description": res["track_description"],
+                        "lastfm_release_date": res["release_date"],
+                        "lastfm_album_name": res["album_name"],
+                    })
+
+                    # prepare artist row (unique)
+                    artist_record = {
+                        "id": artist_id_final,
+                        "artist": artist_name_clean or artist,
+                        "lastfm_artist": artist_name_clean or artist,
+                        "lastfm_artist_bio": artist_bio,
+                    }
+                    # only add to new_artist_rows if not already written or seen in this chunk
+                    if artist_id_final not in artists_written:
+                        new_artist_rows.append(artist_record)
+                        artists_written.add(artist_id_final)
+                        new_written.append(artist_id_final)
+
+                except Exception as e:
+                    print(f"Error processing row {idx}: {e}")
+                    # append empty LASTFM columns on error (keeps column alignment)
+                    new_rows.append({c: "" for c in cols_to_add})
+
+            added_df = pd.DataFrame(new_rows, index=chunk.index[start_in_chunk:end_in_chunk])
+            # keep original columns (artist,song,link,text,...) and append only the LASTFM fields
+            out_df = pd.concat([chunk.iloc[start_in_chunk:end_in_chunk].reset_index(drop=True), added_df.reset_index(drop=True)], axis=1)
+
+            # write songs output
+            songs_out.append(out_df)
+
+            # write new artist rows (unique)
+            if new_artist_rows:
+                art_df = pd.DataFrame(new_artist_rows)
+                artists_out.append(art_df)
 
-        global_index += n
-        _save_progress(global_index, progress_file, cache)
+            global_index += n
+            # only checkpoint once the chunk's songs and artists are written, so
+            # a resume never skips rows or artists that never reached the output
+            _checkpoint(global_index)
+
+        # fold the journal into a single snapshot
+        if checkpoints:
+            cache['__artists_written__'] = sorted(artists_written)
+            _save_progress(global_index, progress_file, cache, generation + 1)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+        songs_out.close()
+        artists_out.close()
+        # close the response cache this call opened (one configured by the caller stays open)
+        if response_cache_path:
+            configure_response_cache(None)
 
     print(f"Finished augmenting CSV. Output written to {out_csv_path}")
+    print_request_stats()
@@ -0,0 +1,300 @@
+"""Single-pass profiling of the song/artist tables.
+
+`profile_table` reads a table once, chunk by chunk, and collects per column
+the null count, distinct count, most frequent values and numeric summary,
+plus the number of duplicate rows. The result is a plain dict that can be
+saved as JSON (`write_report`) or printed (`print_report`).
+
+Distinct counts are exact until a column passes `exact_distinct_limit`
+distinct values and are then estimated with HyperLogLog. Most frequent values
+come from a mergeable Misra-Gries summary, so their counts are lower bounds
+within rows / (capacity + 1) of the true count.
+"""
+
+import json
+import math
+import os
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from storage_utils import iter_table
+
+
+class _HyperLogLog:
+    """HyperLogLog distinct counter over 64-bit hashes (2**p registers)."""
+
+    def __init__(self, p: int = 14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def add(self, hashes: np.ndarray) -> None:
+        if len(hashes) == 0:
+            return
+        hashes = hashes.astype(np.uint64, copy=False)
+        idx = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # rank = position of the leftmost 1 bit in the remaining 64 - p bits
+        bit_length = np.zeros(len(rest), dtype=np.int64)
+        nonzero = rest > 0
+        bit_length[nonzero] = np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.int64) + 1
+        rank = (64 - self.p) - bit_length + 1
+        np.maximum.at(self.registers, idx, rank.astype(np.uint8))
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros:
+            return int(round(self.m * math.log(self.m / zeros)))
+        return int(round(raw))
+
+
+class _DistinctCounter:
+    """Exact distinct count of hashes, switching to HyperLogLog past `limit`."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.seen: Optional[np.ndarray] = np.array([], dtype=np.uint64)
+        self.hll: Optional[_HyperLogLog] = None
+
+    def add(self, hashes: np.ndarray) -> None:
+        if self.hll is not None:
+            self.hll.add(hashes)
+            return
+        self.seen = np.union1d(self.seen, hashes)
+        if len(self.seen) > self.limit:
+            self.hll = _HyperLogLog()
+            self.hll.add(self.seen)
+            self.seen = None
+
+    @property
+    def method(self) -> str:
+        return "exact" if self.hll is None else "hyperloglog"
+
+    def count(self) -> int:
+        return len(self.seen) if self.hll is None else self.hll.estimate()
+
+
+class _HeavyHitters:
+    """Mergeable Misra-Gries summary keeping at most `capacity` candidates."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[Any, int] = {}
+
+    def add(self, value_counts: pd.Series) -> None:
+        # reduce the chunk to its own summary first, so mostly-unique columns
+        # (lyrics, bios) contribute almost nothing to merge
+        if len(value_counts) > self.capacity:
+            cut = int(value_counts.nlargest(self.capacity + 1).iloc[-1])
+            value_counts = value_counts[value_counts > cut] - cut
+        for value, cnt in value_counts.items():
+            self.counts[value] = self.counts.get(value, 0) + int(cnt)
+        if len(self.counts) > self.capacity:
+            # subtract the (capacity + 1)-th largest count and drop what falls to zero
+            cut = sorted(self.counts.values(), reverse=True)[self.capacity]
+            self.counts = {v: c - cut for v, c in self.counts.items() if c > cut}
+
+    def top(self, k: int) -> List[List[Any]]:
+        items = sorted(self.counts.items(), key=lambda x: x[1], reverse=True)[:k]
+        return [[v, c] for v, c in items]
+
+
+class _NumericSummary:
+    """Count, mean, std, min and max merged chunk by chunk (Chan et al.)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values: pd.Series) -> None:
+        values = values.dropna().to_numpy(dtype=np.float64)
+        n_b = len(values)
+        if n_b == 0:
+            return
+        mean_b = float(values.mean())
+        m2_b = float(((values - mean_b) ** 2).sum())
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def report(self) -> Dict[str, Optional[float]]:
+        if self.n == 0:
+            return {"count": 0, "mean": None, "std": None, "min": None, "max": None}
+        std = math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+        return {"count": self.n, "mean": self.mean, "std": std, "min": self.min, "max": self.max}
+
+
+def _iter_chunks(source: Union[str, pd.DataFrame, Iterable[pd.DataFrame]], chunksize: int):
+    if isinstance(source, (str, os.PathLike)):
+        yield from iter_table(str(source), chunksize)
+    elif isinstance(source, pd.DataFrame):
+        for start in range(0, max(len(source), 1), chunksize):
+            yield source.iloc[start:start + chunksize]
+    else:
+        yield from source
+
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def profile_table(
+    source: Union[str, pd.DataFrame, Iterable[pd.DataFrame]],
+    chunksize: int = 100_000,
+    top_k: int = 5,
+    exact_distinct_limit: int = 100_000,
+    heavy_hitters_capacity: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Profile a table in one pass over its chunks.
+
+    `source` is a CSV/Parquet path, a DataFrame or an iterable of DataFrames.
+    Returns a JSON-serializable dict with the row/column counts, the number
+    of duplicate rows and, per column, its dtype, null count, distinct count
+    (and whether it is exact), top `top_k` values for text/categorical columns
+    and count/mean/std/min/max for numeric columns.
+    """
+    capacity = heavy_hitters_capacity or max(1000, 50 * top_k)
+    rows = 0
+    dtypes: Dict[str, str] = {}
+    nulls: Dict[str, int] = {}
+    distinct: Dict[str, _DistinctCounter] = {}
+    heavy: Dict[str, _HeavyHitters] = {}
+    numeric: Dict[str, _NumericSummary] = {}
+    seen_rows = np.array([], dtype=np.uint64)
+    duplicate_rows = 0
+
+    for chunk in _iter_chunks(source, chunksize):
+        if chunk.empty:
+            continue
+        rows += len(chunk)
+
+        # duplicate rows, by row hash, against this chunk and all earlier ones
+        row_hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        dup_in_chunk = pd.Series(row_hashes).duplicated().to_numpy()
+        dup_before = np.isin(row_hashes, seen_rows)
+        duplicate_rows += int(np.count_nonzero(dup_in_chunk | dup_before))
+        seen_rows = np.union1d(seen_rows, row_hashes)
+
+        for col in chunk.columns:
+            series = chunk[col]
+            if col not in dtypes:
+                dtypes[col] = str(series.dtype)
+                nulls[col] = 0
+                distinct[col] = _DistinctCounter(exact_distinct_limit)
+                if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                    numeric[col] = _NumericSummary()
+                else:
+                    heavy[col] = _HeavyHitters(capacity)
+
+            elif col in numeric and not pd.api.types.is_numeric_dtype(series):
+                # a CSV column read as numbers in the first chunks and with text
+                # later: it becomes a text column from here on (its top values only
+                # count the rows from this chunk on, still lower bounds)
+                del numeric[col]
+                dtypes[col] = str(series.dtype)
+                heavy[col] = _HeavyHitters(capacity)
+
+            null_mask = series.isna()
+            nulls[col] += int(null_mask.sum())
+            present = series[~null_mask]
+            distinct[col].add(pd.util.hash_pandas_object(present, index=False).to_numpy())
+            if col in numeric:
+                numeric[col].add(present)
+            else:
+                heavy[col].add(present.value_counts(sort=False))
+
+    report: Dict[str, Any] = {
+        "rows": rows,
+        "columns": len(dtypes),
+        "duplicate_rows": duplicate_rows,
+        "column_profiles": {},
+    }
+    for col, dtype in dtypes.items():
+        profile: Dict[str, Any] = {
+            "dtype": dtype,
+            "nulls": nulls[col],
+            "distinct": distinct[col].count(),
+            "distinct_method": distinct[col].method,
+        }
+        if col in numeric:
+            profile["numeric"] = numeric[col].report()
+        else:
+            profile["top"] = [[_to_json_value(v), c] for v, c in heavy[col].top(top_k)]
+        report["column_profiles"][col] = profile
+    return report
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def print_report(report: Dict[str, Any], details: bool = True) -> None:
+    """Print a report in the layout of the old dataAnalysis output."""
+    profiles = report["column_profiles"]
+
+    print("===== DATAFRAME SHAPE =====")
+    print(f"Rows: {report['rows']}, Columns: {report['columns']}\n")
+
+    print("===== COLUMN NAMES AND DATA TYPES =====")
+    for col, p in profiles.items():
+        print(f"{col}: {p['dtype']}")
+    print()
+
+    print("===== MISSING VALUES =====")
+    missing = {col: p["nulls"] for col, p in profiles.items() if p["nulls"] > 0}
+    if missing:
+        for col, n in missing.items():
+            print(f"{col}: {n}")
+        print()
+    else:
+        print("No missing values\n")
+
+    print("===== DUPLICATE ROWS =====")
+    print(f"Number of duplicate rows: {report['duplicate_rows']}\n")
+
+    print("===== UNIQUE VALUES PER COLUMN =====")
+    for col, p in profiles.items():
+        approx = "" if p["distinct_method"] == "exact" else " (approx.)"
+        print(f"{col}: {p['distinct']} unique values{approx}")
+    print()
+
+    if details:
+        print_report_details(report)
+
+
+def print_report_details(report: Dict[str, Any]) -> None:
+    """Print the numeric summaries and most frequent values of a report."""
+    profiles = report["column_profiles"]
+
+    print("===== BASIC STATISTICS FOR NUMERIC COLUMNS =====")
+    numeric = {col: p["numeric"] for col, p in profiles.items() if "numeric" in p}
+    if numeric:
+        print(pd.DataFrame(numeric), "\n")
+    else:
+        print("No numeric columns.\n")
+
+    print("===== MOST FREQUENT VALUES FOR CATEGORICAL COLUMNS =====")
+    for col, p in profiles.items():
+        if "top" in p:
+            print(f"{col}:")
+            for value, cnt in p["top"]:
+                print(f"  {value}: {cnt}")
+            print()
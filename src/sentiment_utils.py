@@ -1,87 +1,330 @@
+import hashlib
+import importlib.util
+import json
 import os
-from typing import Optional, Tuple
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from importlib import metadata
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-
-# optional emotion libraries (NRCLex or text2emotion)
-try:
-    from nrclex import NRCLex  # type: ignore
-    _HAS_NR_CLEX = True
-except Exception:
-    NRCLex = None  # type: ignore
-    _HAS_NR_CLEX = False
-
-try:
-    import text2emotion as te  # type: ignore
-    _HAS_TEXT2EMOTION = True
-except Exception:
-    te = None  # type: ignore
-    _HAS_TEXT2EMOTION = False
 
+from storage_utils import TableAppender, iter_table, read_table, remove_table, table_columns
 
-def analyze_song_sentiments(
-    input_csv: str,
-    text_column: str = "song_lyrics",
-    output_plot: Optional[str] = None,
-    show_plot: bool = False,
-) -> Tuple[pd.DataFrame, plt.Figure]:
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
+# matplotlib, nltk, NRCLex, text2emotion and scikit-learn are imported when
+# first needed, so importing this module (e.g. from datasetMood.py or a
+# worker process) does not pay for libraries the caller never uses
 
-    # Verificações iniciais
-    abs_path = os.path.abspath(input_csv)
-    if not os.path.exists(abs_path):
-        raise FileNotFoundError(f"Ficheiro não encontrado: {abs_path}")
 
-    if os.path.getsize(abs_path) == 0:
-        raise ValueError(f"Ficheiro '{abs_path}' está vazio.")
+def _load_nrclex():
+    try:
+        from nrclex import NRCLex  # type: ignore
+    except Exception:
+        raise ImportError("NRCLex não está instalado. Instale com: pip install nrclex")
+    return NRCLex
 
-    # Ler CSV (detecta separador padrão, permite erro claro)
+
+def _load_text2emotion():
     try:
-        df = pd.read_csv(abs_path)
-    except Exception as e:
-        raise ValueError(f"Erro ao ler CSV '{abs_path}': {e}")
+        import text2emotion as te  # type: ignore
+    except Exception:
+        raise ImportError("text2emotion não está instalado. Instale com: pip install text2emotion")
+    return te
+
+
+# ------------------ VADER scoring engine ------------------
 
-    if text_column not in df.columns:
-        raise ValueError(f"Coluna '{text_column}' não encontrada no CSV. Colunas disponíveis: {list(df.columns)}")
+# one analyzer per process, created by _init_vader_worker
+_worker_sia = None
+
+
+def _ensure_vader_lexicon() -> None:
+    import nltk
 
-    # Preparar NLTK VADER
     try:
         nltk.data.find("sentiment/vader_lexicon.zip")
     except LookupError:
         nltk.download("vader_lexicon", quiet=True)
 
-    sia = SentimentIntensityAnalyzer()
 
-    # Calcular sentimento por linha
-    def label_from_score(score: float) -> str:
-        if score >= 0.05:
-            return "positive"
-        if score <= -0.05:
-            return "negative"
-        return "neutral"
+def _init_vader_worker() -> None:
+    global _worker_sia
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    _ensure_vader_lexicon()
+    _worker_sia = SentimentIntensityAnalyzer()
 
-    sentiments = []
-    for i, text in enumerate(df[text_column].fillna("")):
+
+def _score_batch(texts: Sequence) -> List[float]:
+    """Compound VADER score per text; empty or non-text values and failures score 0.0."""
+    if _worker_sia is None:
+        _init_vader_worker()
+    scores = []
+    for text in texts:
         if not isinstance(text, str) or text.strip() == "":
-            sentiments.append("neutral")
+            scores.append(0.0)
             continue
         try:
-            score = sia.polarity_scores(text).get("compound", 0.0)
+            scores.append(_worker_sia.polarity_scores(text).get("compound", 0.0))
         except Exception:
-            score = 0.0
-        sentiments.append(label_from_score(score))
+            scores.append(0.0)
+    return scores
+
+
+def vader_pool(n_jobs: Optional[int] = 1) -> Optional[ProcessPoolExecutor]:
+    """Process pool for `score_sentiments` (one analyzer per worker), or None if `n_jobs` <= 1.
+
+    Workers start on the first batch, so an unused pool costs nothing; the
+    caller shuts it down.
+    """
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_vader_worker)
+
+
+def score_sentiments(
+    texts: Sequence,
+    n_jobs: Optional[int] = 1,
+    batch_size: int = 500,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> np.ndarray:
+    """Return the VADER compound score of every text as a float64 array.
+
+    With `n_jobs` > 1 (None = all cores) the texts are split in batches of
+    `batch_size` and scored by a process pool with one SentimentIntensityAnalyzer
+    per worker; the result keeps the input order. Pass a `pool` (see
+    `vader_pool`) to reuse the same workers across calls, e.g. one per chunk.
+    """
+    texts = list(texts)
+    if len(texts) <= batch_size:
+        return np.asarray(_score_batch(texts), dtype=np.float64)
+    if pool is None:
+        pool = vader_pool(n_jobs)
+        if pool is None:
+            return np.asarray(_score_batch(texts), dtype=np.float64)
+        with pool:
+            return score_sentiments(texts, batch_size=batch_size, pool=pool)
+
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    scores = [score for batch in pool.map(_score_batch, batches) for score in batch]
+    return np.asarray(scores, dtype=np.float64)
+
+
+def sentiment_labels(scores: np.ndarray) -> np.ndarray:
+    """Map compound scores to positive (>= 0.05) / negative (<= -0.05) / neutral."""
+    return np.select([scores >= 0.05, scores <= -0.05], ["positive", "negative"], "neutral")
+
+
+# ------------------ persistent score store ------------------
+
+
+class ScoreStore:
+    """SQLite store of per-document scores keyed by text hash and engine.
+
+    The engine id includes the engine version (see `engine_id`), so upgrading
+    VADER/NRCLex/text2emotion invalidates old scores automatically.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "engine TEXT, text_hash TEXT, score TEXT, PRIMARY KEY (engine, text_hash))"
+        )
+        self._conn.commit()
+
+    def get_many(self, engine: str, hashes: Sequence[str]) -> Dict[str, Any]:
+        found = {}
+        hashes = list(hashes)
+        # stay below SQLite's limit on bound parameters
+        for i in range(0, len(hashes), 500):
+            part = hashes[i:i + 500]
+            rows = self._conn.execute(
+                f"SELECT text_hash, score FROM scores WHERE engine = ? AND text_hash IN ({','.join('?' * len(part))})",
+                [engine, *part],
+            )
+            found.update((h, json.loads(score)) for h, score in rows)
+        return found
+
+    def put_many(self, engine: str, scores: Dict[str, Any]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO scores (engine, text_hash, score) VALUES (?, ?, ?)",
+            [(engine, h, json.dumps(score)) for h, score in scores.items()],
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
 
-    df = df.copy()
-    df["_sentiment"] = sentiments
 
-    counts = df["_sentiment"].value_counts().reindex(["positive", "neutral", "negative"]).fillna(0).astype(int)
+def engine_id(engine: str) -> str:
+    """Engine name plus the installed version of the package that implements it."""
+    package = {"vader": "nltk", "nrclex": "NRCLex", "nrc": "NRCLex", "text2emotion": "text2emotion"}.get(engine, engine)
+    return f"{engine}:{_package_version(package)}"
+
+
+def text_hash(text: Any) -> str:
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+
+def _cached_scores(
+    texts: Sequence,
+    engine: str,
+    compute: Callable[[List[Any]], List[Any]],
+    store_path: Optional[str],
+) -> List[Any]:
+    """Return one score per text, computing only texts missing from the store.
+
+    `compute` receives the distinct texts that still need scoring and must
+    return their scores in the same order. Without `store_path` every
+    distinct text is computed.
+    """
+    texts = list(texts)
+    hashes = [text_hash(t) for t in texts]
+    store = ScoreStore(store_path) if store_path else None
+    try:
+        eid = engine_id(engine)
+        known = store.get_many(eid, set(hashes)) if store else {}
+        todo: Dict[str, Any] = {}
+        for h, t in zip(hashes, texts):
+            if h not in known and h not in todo:
+                todo[h] = t
+        if todo:
+            new_scores = dict(zip(todo, compute(list(todo.values()))))
+            if store:
+                store.put_many(eid, new_scores)
+            known.update(new_scores)
+        return [known[h] for h in hashes]
+    finally:
+        if store:
+            store.close()
+
+
+def _check_text_table(input_csv: str, text_column: str) -> str:
+    """Absolute path of the input table, after checking it has `text_column`."""
+    abs_path = os.path.abspath(input_csv)
+    if not os.path.exists(abs_path):
+        raise FileNotFoundError(f"Ficheiro não encontrado: {abs_path}")
+    if os.path.isfile(abs_path) and os.path.getsize(abs_path) == 0:
+        raise ValueError(f"Ficheiro '{abs_path}' está vazio.")
+
+    try:
+        columns = table_columns(abs_path)
+    except Exception as e:
+        raise ValueError(f"Erro ao ler CSV '{abs_path}': {e}")
+    if text_column not in columns:
+        raise ValueError(f"Coluna '{text_column}' não encontrada no CSV. Colunas disponíveis: {columns}")
+    return abs_path
+
+
+def _open_text_column(input_csv: str, text_column: str, chunksize: Optional[int]) -> Iterator[pd.Series]:
+    """Check the input table and return an iterator over `text_column` only.
+
+    With `chunksize` the column is read `chunksize` rows at a time, so memory
+    stays flat whatever the size of the table; without it it is read whole.
+    """
+    abs_path = _check_text_table(input_csv, text_column)
+    if chunksize:
+        return (chunk[text_column] for chunk in iter_table(abs_path, chunksize, columns=[text_column]))
+    return iter([read_table(abs_path, columns=[text_column])[text_column]])
+
+
+def _open_table_out(path: Optional[str]) -> Optional[TableAppender]:
+    if not path:
+        return None
+    remove_table(path)
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    return TableAppender(path)
+
+
+def analyze_song_sentiments(
+    input_csv: str,
+    text_column: str = "song_lyrics",
+    output_plot: Optional[str] = None,
+    show_plot: bool = False,
+    n_jobs: Optional[int] = 1,
+    return_scores: bool = False,
+    score_cache: Optional[str] = None,
+    chunksize: Optional[int] = None,
+    scores_out: Optional[str] = None,
+):
+    """Count positive/neutral/negative songs (VADER) and plot the distribution.
+
+    Returns (counts_df, fig), or (counts_df, fig, scores) with `return_scores`,
+    where `scores` holds the compound score of every row. `n_jobs` > 1 scores
+    the lyrics in a process pool (see `score_sentiments`). With `score_cache`
+    (a SQLite file) only lyrics not scored before by this VADER version are
+    scored.
+
+    Only `text_column` is read. With `chunksize` it is read and scored in
+    chunks and only the counts are kept, so memory does not grow with the
+    table. `scores_out` (CSV or Parquet) receives the row number, compound
+    score and label of every row.
+    """
+    texts_iter = _open_text_column(input_csv, text_column, chunksize)
+    appender = _open_table_out(scores_out)
+    # one pool for all the chunks, so the workers load VADER only once
+    pool = vader_pool(n_jobs)
+
+    # Calcular sentimento por bloco (VADER) e acumular as contagens
+    totals = {"positive": 0, "neutral": 0, "negative": 0}
+    score_parts = []
+    row = 0
+    try:
+        for texts in texts_iter:
+            texts = texts.fillna("").tolist()
+            scores = np.asarray(
+                _cached_scores(
+                    texts,
+                    "vader",
+                    lambda todo: score_sentiments(todo, pool=pool).tolist(),
+                    score_cache,
+                ),
+                dtype=np.float64,
+            )
+            labels = sentiment_labels(scores)
+            for label, n in zip(*np.unique(labels, return_counts=True)):
+                totals[str(label)] += int(n)
+            if appender:
+                appender.append(pd.DataFrame({
+                    "row": np.arange(row, row + len(texts)),
+                    "compound": scores,
+                    "sentiment": labels,
+                }))
+            if return_scores:
+                score_parts.append(scores)
+            row += len(texts)
+    finally:
+        if pool:
+            pool.shutdown()
+        if appender:
+            appender.close()
+
+    counts = pd.Series(totals)
     sentiment_counts_df = counts.reset_index()
     sentiment_counts_df.columns = ["sentiment", "count"]
 
     # Plot
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(6, 4))
     colors = {"positive": "#2ca02c", "neutral": "#7f7f7f", "negative": "#d62728"}
     sentiments_order = sentiment_counts_df["sentiment"].tolist()
@@ -109,54 +352,166 @@ def analyze_song_sentiments(
     else:
         plt.close(fig)
 
+    if return_scores:
+        scores = np.concatenate(score_parts) if score_parts else np.zeros(0, dtype=np.float64)
+        return sentiment_counts_df, fig, scores
     return sentiment_counts_df, fig
 
 
+def _emotion_scores(text: str, engine: str) -> Dict[str, float]:
+    """Emotion scores of one text: NRCLex counts or text2emotion proportions."""
+    if engine == "nrclex":
+        # raw_emotion_scores é um dict {emotion: count}
+        return dict(_load_nrclex()(text).raw_emotion_scores)
+    # text2emotion retorna: {'Happy':0.0,...}; score é uma proporção
+    return {emo.lower(): float(score) for emo, score in _load_text2emotion().get_emotion(text).items()}
+
+
+# ------------------ vectorized NRC lexicon engine ------------------
+
+
+def _find_nrc_lexicon() -> str:
+    """Path of the nrc_en.json shipped with the nrclex package (without importing it)."""
+    spec = importlib.util.find_spec("nrclex")
+    if spec is None:
+        raise ImportError(
+            "Léxico NRC não encontrado. Instale com: pip install nrclex, ou indique lexicon_path=<nrc_en.json>"
+        )
+    if spec.submodule_search_locations:
+        roots = list(spec.submodule_search_locations)
+        candidates = [os.path.join(r, "data", "nrc_en.json") for r in roots] + [os.path.join(r, "nrc_en.json") for r in roots]
+    else:
+        candidates = [os.path.join(os.path.dirname(spec.origin), "nrc_en.json")]
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"nrc_en.json não encontrado no pacote nrclex ({candidates})")
+
+
+@lru_cache(maxsize=4)
+def _nrc_model(lexicon_path: Optional[str] = None):
+    """(vectorizer, term x emotion matrix, emotions) for an NRC lexicon JSON file."""
+    try:
+        from scipy import sparse
+        from sklearn.feature_extraction.text import CountVectorizer
+    except ImportError:
+        raise ImportError("scikit-learn não está instalado. Instale com: pip install scikit-learn")
+
+    with open(lexicon_path or _find_nrc_lexicon(), "r", encoding="utf-8") as f:
+        lexicon: Dict[str, List[str]] = json.load(f)
+
+    terms = sorted(lexicon)
+    emotions = sorted({emo for emos in lexicon.values() for emo in emos})
+    emo_index = {emo: j for j, emo in enumerate(emotions)}
+    rows, cols = [], []
+    for i, term in enumerate(terms):
+        for emo in set(lexicon[term]):
+            rows.append(i)
+            cols.append(emo_index[emo])
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(terms), len(emotions))
+    )
+    # fixed vocabulary: only lexicon words are counted, no fit pass over the corpus
+    vectorizer = CountVectorizer(
+        vocabulary={term: i for i, term in enumerate(terms)},
+        lowercase=True,
+        token_pattern=r"[a-z]+",
+        dtype=np.int32,
+    )
+    return vectorizer, matrix, emotions
+
+
+def emotion_matrix(texts: Sequence, lexicon_path: Optional[str] = None) -> Tuple[np.ndarray, List[str]]:
+    """Raw NRC emotion counts of every text in one sparse matrix product.
+
+    Returns (counts, emotions) where counts[i, j] is the number of words of
+    text i associated with emotions[j], like NRCLex's raw_emotion_scores.
+    Unlike NRCLex, words are lowercased and not lemmatized. Non-text values
+    count as empty texts.
+    """
+    vectorizer, matrix, emotions = _nrc_model(lexicon_path)
+    docs = [t if isinstance(t, str) else "" for t in texts]
+    if not docs:
+        return np.zeros((0, len(emotions)), dtype=np.int64), emotions
+    doc_terms = vectorizer.transform(docs)
+    return (doc_terms @ matrix).toarray().astype(np.int64), emotions
+
+
+def _nrc_scores(texts: List[str], lexicon_path: Optional[str]) -> List[Dict[str, int]]:
+    counts, emotions = emotion_matrix(texts, lexicon_path)
+    return [{emotions[j]: int(row[j]) for j in np.flatnonzero(row)} for row in counts]
+
+
 def analyze_song_emotions(
     input_csv: str,
     text_column: str = "song_lyrics",
     output_plot: Optional[str] = None,
     engine: str = "nrclex",
     show_plot: bool = False,
-) -> Tuple[pd.DataFrame, plt.Figure]:
+    score_cache: Optional[str] = None,
+    lexicon_path: Optional[str] = None,
+    chunksize: Optional[int] = None,
+    scores_out: Optional[str] = None,
+) -> Tuple[pd.DataFrame, "Figure"]:
+    """Sum the emotions found in every song and plot them.
+
+    `engine` is "nrclex" (one NRCLex object per song), "nrc" (the same NRC
+    lexicon applied to all songs at once, see `emotion_matrix`; `lexicon_path`
+    overrides the lexicon bundled with nrclex) or "text2emotion".
+    With `score_cache` (a SQLite file) the per-song emotion scores are stored
+    and only new or changed lyrics are analysed on later runs.
+
+    As in `analyze_song_sentiments`, only `text_column` is read, in chunks
+    when `chunksize` is given, and `scores_out` receives the row number and
+    the emotion scores (as JSON) of every non-empty row.
+    """
 
-    abs_path = os.path.abspath(input_csv)
-    if not os.path.exists(abs_path):
-        raise FileNotFoundError(f"Ficheiro não encontrado: {abs_path}")
-    if os.path.getsize(abs_path) == 0:
-        raise ValueError(f"Ficheiro '{abs_path}' está vazio.")
+    # choose engine
+    engine = engine.lower()
+    if engine == "nrclex":
+        _load_nrclex()
+    if engine == "text2emotion":
+        _load_text2emotion()
 
-    try:
-        df = pd.read_csv(abs_path)
-    except Exception as e:
-        raise ValueError(f"Erro ao ler CSV '{abs_path}': {e}")
+    if engine not in ("nrclex", "nrc", "text2emotion"):
+        raise ValueError(f"Motor de emoção desconhecido: '{engine}'")
 
-    if text_column not in df.columns:
-        raise ValueError(f"Coluna '{text_column}' não encontrada no CSV. Colunas disponíveis: {list(df.columns)}")
+    if engine == "nrc":
+        cache_engine = "nrc"
+        if lexicon_path:
+            with open(lexicon_path, "rb") as f:
+                cache_engine = f"nrc@{hashlib.sha1(f.read()).hexdigest()[:12]}"
+        compute = lambda todo: _nrc_scores(todo, lexicon_path)
+    else:
+        cache_engine = engine
+        compute = lambda todo: [_emotion_scores(t, engine) for t in todo]
 
-    # choose engine
-    engine = engine.lower()
-    if engine == "nrclex" and not _HAS_NR_CLEX:
-        raise ImportError("NRCLex não está instalado. Instale com: pip install nrclex")
-    if engine == "text2emotion" and not _HAS_TEXT2EMOTION:
-        raise ImportError("text2emotion não está instalado. Instale com: pip install text2emotion")
+    texts_iter = _open_text_column(input_csv, text_column, chunksize)
+    appender = _open_table_out(scores_out)
 
     total_counts = {}
-
-    for text in df[text_column].fillna(""):
-        if not isinstance(text, str) or text.strip() == "":
-            continue
-        if engine == "nrclex":
-            obj = NRCLex(text)
-            # raw_emotion_scores é um dict {emotion: count}
-            for emo, cnt in obj.raw_emotion_scores.items():
-                total_counts[emo] = total_counts.get(emo, 0) + cnt
-        else:
-            # text2emotion retorna: {'Happy':0.0,...}
-            emo_scores = te.get_emotion(text)
-            for emo, score in emo_scores.items():
-                # score é uma proporção; agregamos como soma de pontuações
-                total_counts[emo.lower()] = total_counts.get(emo.lower(), 0.0) + float(score)
+    row = 0
+    try:
+        for column in texts_iter:
+            keep = [
+                (i, t) for i, t in enumerate(column.fillna(""), start=row)
+                if isinstance(t, str) and t.strip() != ""
+            ]
+            row += len(column)
+            if not keep:
+                continue
+            per_song = _cached_scores([t for _, t in keep], cache_engine, compute, score_cache)
+            for emo_scores in per_song:
+                for emo, score in emo_scores.items():
+                    total_counts[emo] = total_counts.get(emo, 0) + score
+            if appender:
+                appender.append(pd.DataFrame({
+                    "row": [i for i, _ in keep],
+                    "emotions": [json.dumps(e, sort_keys=True) for e in per_song],
+                }))
+    finally:
+        if appender:
+            appender.close()
 
     # normalize text2emotion scores to counts-like numbers if needed
     if engine == "text2emotion":
@@ -172,6 +527,8 @@ def analyze_song_emotions(
     emo_df = pd.DataFrame(emo_items, columns=["emotion", "count"])
 
     # Plot
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=(8, 5))
     ax.bar(emo_df['emotion'], emo_df['count'], color='#1f77b4')
     ax.set_title('Distribution of Emotions in Songs')
@@ -192,6 +549,61 @@ def analyze_song_emotions(
     return emo_df, fig
 
 
+# ------------------ mood fields for the Solr index ------------------
+
+MOOD_POLARITY_FIELD = "polarity"
+MOOD_EMOTION_PREFIX = "emotion_"
+
+
+def add_mood_fields(
+    input_path: str,
+    output_path: str,
+    text_column: str = "song_lyrics",
+    chunksize: int = 10_000,
+    n_jobs: Optional[int] = 1,
+    score_cache: Optional[str] = None,
+    lexicon_path: Optional[str] = None,
+) -> List[str]:
+    """Copy a table to `output_path` adding numeric mood fields to every row.
+
+    - `polarity`: VADER compound score of `text_column`, in [-1, 1]
+    - `emotion_<name>`: share of the NRC emotion hits of the text that belong
+      to <name> (anger, joy, sadness, ...), in [0, 1]; 0 for texts without hits
+
+    The table is processed `chunksize` rows at a time. Returns the names of
+    the added fields, which match the numeric fields of the Solr schemas.
+    """
+    if os.path.abspath(input_path) == os.path.abspath(output_path):
+        raise ValueError("input_path e output_path têm de ser ficheiros diferentes.")
+    input_path = _check_text_table(input_path, text_column)
+
+    emotions = _nrc_model(lexicon_path)[2]
+    fields = [MOOD_POLARITY_FIELD] + [MOOD_EMOTION_PREFIX + emo for emo in emotions]
+    appender = _open_table_out(output_path)
+    pool = vader_pool(n_jobs)
+    try:
+        for chunk in iter_table(input_path, chunksize):
+            texts = chunk[text_column].fillna("").tolist()
+            polarity = np.asarray(
+                _cached_scores(texts, "vader", lambda todo: score_sentiments(todo, pool=pool).tolist(), score_cache),
+                dtype=np.float64,
+            )
+            counts, _ = emotion_matrix(texts, lexicon_path)
+            hits = counts.sum(axis=1, keepdims=True)
+            shares = np.divide(counts, hits, out=np.zeros(counts.shape), where=hits > 0)
+
+            out = chunk.copy()
+            out[MOOD_POLARITY_FIELD] = np.round(polarity, 4)
+            for j, emo in enumerate(emotions):
+                out[MOOD_EMOTION_PREFIX + emo] = np.round(shares[:, j], 4)
+            appender.append(out)
+    finally:
+        if pool:
+            pool.shutdown()
+        appender.close()
+    return fields
+
+
 if __name__ == "__main__":
     # Pequeno exemplo de uso quando executado diretamente
     import argparse
@@ -201,12 +613,17 @@ if __name__ == "__main__":
     parser.add_argument("--col", default="song_lyrics", help="Coluna com letras")
     parser.add_argument("--out", help="Caminho para salvar o gráfico (png)")
     parser.add_argument("--mode", choices=["polarity", "emotion"], default="polarity", help="'polarity' para positivo/negativo/neutro ou 'emotion' para emoções granulares")
-    parser.add_argument("--engine", choices=["nrclex", "text2emotion"], default="nrclex", help="Motor de emoção a usar (quando --mode emotion)")
+    parser.add_argument("--engine", choices=["nrclex", "nrc", "text2emotion"], default="nrclex", help="Motor de emoção a usar (quando --mode emotion)")
+    parser.add_argument("--jobs", type=int, default=1, help="Processos para o VADER (0 = todos os cores)")
+    parser.add_argument("--cache", help="Ficheiro SQLite para guardar as pontuações por música")
+    parser.add_argument("--lexicon", help="Ficheiro JSON do léxico NRC (motor 'nrc')")
+    parser.add_argument("--chunksize", type=int, help="Ler e analisar as letras em blocos deste número de linhas")
+    parser.add_argument("--scores-out", help="Ficheiro (CSV ou Parquet) para guardar a pontuação de cada linha")
     args = parser.parse_args()
 
     if args.mode == "polarity":
-        df_counts, _ = analyze_song_sentiments(args.csv, text_column=args.col, output_plot=args.out, show_plot=True)
+        df_counts, _ = analyze_song_sentiments(args.csv, text_column=args.col, output_plot=args.out, show_plot=True, n_jobs=args.jobs or None, score_cache=args.cache, chunksize=args.chunksize, scores_out=args.scores_out)
         print(df_counts)
     else:
-        emo_df, _ = analyze_song_emotions(args.csv, text_column=args.col, output_plot=args.out, engine=args.engine, show_plot=True)
+        emo_df, _ = analyze_song_emotions(args.csv, text_column=args.col, output_plot=args.out, engine=args.engine, show_plot=True, score_cache=args.cache, lexicon_path=args.lexicon, chunksize=args.chunksize, scores_out=args.scores_out)
         print(emo_df)
@@ -1,55 +1,115 @@
 #!/usr/bin/env python3
-import subprocess
+"""
+Cria os cores do Solr pela API HTTP (ConfigSets + Collections), sem docker exec.
+
+O Solr tem de estar em modo SolrCloud (o container do scripts.md é iniciado
+com -c): a API de ConfigSets só existe nesse modo. Cada "core" é uma coleção
+com um shard e uma réplica, por isso os URLs /solr/<core>/... não mudam.
+
+1. O configset base (cópia do _default) recebe synonyms_hand.txt e
+   stopwords.txt uma única vez.
+2. Cada coleção recebe uma cópia desse configset feita no servidor (os
+   schemas dos cores são diferentes, por isso não podem partilhar o mesmo) e
+   é criada a partir dela; as coleções são criadas em paralelo.
+
+O que já existe (configsets, coleções) é ignorado, por isso pode ser corrido
+várias vezes; para mudar os sinónimos de um core existente, apague-o
+(ver scripts.md) e corra de novo.
+"""
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import requests
 
-SOLR_CONTAINER = "song_solr"
+SOLR_URL = "http://localhost:8983/solr"
 CORES = ["simple", "songs"]
+BASE_CONFIGSET = "songs_base"
 
 SYNONYMS_FILE = Path.cwd() / "solr" / "synonyms_hand.txt"
 STOPWORDS_FILE = Path.cwd() / "solr" / "stopwords.txt"
 
 
-def run_command(cmd, check=True):
-    """Executa um comando shell e imprime saída."""
-    print(f"> {' '.join(cmd)}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    print(result.stdout)
-    if result.stderr:
-        print(result.stderr)
-    if check and result.returncode != 0:
-        raise RuntimeError(f"Command failed: {' '.join(cmd)}")
-    return result
+def _call(session, url, params, data=None):
+    if data is None:
+        r = session.get(url, params=params, timeout=120)
+    else:
+        r = session.post(url, params=params, data=data, timeout=120,
+                         headers={"Content-Type": "application/octet-stream"})
+    if r.status_code != 200:
+        raise RuntimeError(f"{params.get('action')} {params.get('name', '')} falhou: {r.status_code} - {r.text}")
+    return r.json()
+
+
+def check_cloud_mode(session, solr_url=SOLR_URL):
+    mode = _call(session, f"{solr_url}/admin/info/system", {"wt": "json"}).get("mode")
+    if mode != "solrcloud":
+        raise RuntimeError(f"O Solr em {solr_url} não está em modo SolrCloud (mode={mode}); "
+                           "inicie o container com -c (ver scripts.md)")
+
+
+def list_configsets(session, solr_url=SOLR_URL):
+    return set(_call(session, f"{solr_url}/admin/configs", {"action": "LIST"}).get("configSets", []))
 
 
+def list_cores(session, solr_url=SOLR_URL):
+    return set(_call(session, f"{solr_url}/admin/collections", {"action": "LIST"}).get("collections", []))
 
-def create_core(core_name):
-    cmd = [
-        "docker", "exec", "-it", SOLR_CONTAINER,
-        "bin/solr", "create_core", "-c", core_name
-    ]
-    run_command(cmd)
 
+def create_configset(session, name, base="_default", solr_url=SOLR_URL):
+    _call(session, f"{solr_url}/admin/configs", {"action": "CREATE", "name": name, "baseConfigSet": base})
 
 
-def copy_conf_files(core_name):
+def upload_conf_file(session, configset, file_path, solr_url=SOLR_URL):
+    if not file_path.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
+    params = {"action": "UPLOAD", "name": configset, "filePath": file_path.name, "overwrite": "true"}
+    _call(session, f"{solr_url}/admin/configs", params, data=file_path.read_bytes())
+
+
+def create_core(session, core_name, solr_url=SOLR_URL, base_configset=BASE_CONFIGSET, existing=()):
+    """Cópia do configset base para o core (no servidor) e criação da coleção."""
+    configset = f"{core_name}_conf"
+    if configset not in existing:
+        create_configset(session, configset, base=base_configset, solr_url=solr_url)
+    else:
+        # sobra de um core apagado: atualizar os ficheiros em vez de reutilizar os antigos
+        for file_path in [SYNONYMS_FILE, STOPWORDS_FILE]:
+            upload_conf_file(session, configset, file_path, solr_url)
+    params = {"action": "CREATE", "name": core_name, "collection.configName": configset,
+              "numShards": 1, "replicationFactor": 1}
+    _call(session, f"{solr_url}/admin/collections", params)
+    print(f"✅ Core '{core_name}' configurado!")
+
+
+def bootstrap(solr_url=SOLR_URL, cores=CORES, base_configset=BASE_CONFIGSET):
+    """Prepara o configset base e cria em paralelo os cores que faltam; devolve os cores criados."""
+    session = requests.Session()
+    check_cloud_mode(session, solr_url)
+    configsets = list_configsets(session, solr_url)
+
+    existing_cores = list_cores(session, solr_url)
+    missing = [core for core in cores if core not in existing_cores]
+    for core in cores:
+        if core not in missing:
+            print(f"Core '{core}' já existe")
+    if not missing:
+        return missing
+
+    if base_configset not in configsets:
+        print(f"🚀 Criar configset '{base_configset}'...")
+        create_configset(session, base_configset, solr_url=solr_url)
+    # os ficheiros são enviados uma vez, só para o configset base
     for file_path in [SYNONYMS_FILE, STOPWORDS_FILE]:
-        if not file_path.exists():
-            raise FileNotFoundError(f"Arquivo não encontrado: {file_path}")
-        cmd = [
-            "docker", "cp",
-            str(file_path),
-            f"{SOLR_CONTAINER}:/var/solr/data/{core_name}/conf/"
-        ]
-        run_command(cmd)
+        upload_conf_file(session, base_configset, file_path, solr_url)
+
+    print(f"🚀 Criar cores {missing}...")
+    with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+        list(pool.map(lambda core: create_core(session, core, solr_url, base_configset, configsets), missing))
+    return missing
 
 
 def main():
-    for core in CORES:
-        print(f"🚀 Criar core '{core}'...")
-        create_core(core)
-        copy_conf_files(core)
-        print(f"✅ Core '{core}' configurado!\n")
+    bootstrap()
 
 
 if __name__ == "__main__":
@@ -1,29 +1,142 @@
 #!/usr/bin/env python3
-import subprocess
+"""
+Indexa o dataset nos cores do Solr com pedidos JSON ao /update.
+
+O CSV é lido uma vez, em blocos, e cada lote de documentos é enviado a todos
+os cores por uma sessão HTTP com ligações reutilizadas e vários envios em
+paralelo por core. O commit é feito uma só vez no fim (ou pelo Solr com
+--commit-within), opcionalmente seguido de optimize.
+
+    python3 ./src/startSolr/load_files_solr.py
+    python3 ./src/startSolr/load_files_solr.py --dataset dataset/dataset_mood.csv --senders 8 --optimize
+"""
+import argparse
+import json
+import math
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
 
 # Configurações
-SOLR_CONTAINER = "song_solr"
-CORES = ["simple", "songs"] 
-DATASET_FILE = "/data/dataset.csv"  
-
-def run_command(cmd):
-    print(f"> {' '.join(cmd)}")
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    print(result.stdout)
-    if result.stderr:
-        print(result.stderr)
-    if result.returncode != 0:
-        raise RuntimeError(f"Command failed: {' '.join(cmd)}")
-
-def post_docs():
-    for core in CORES:
-        print(f"🚀 Adicionar docs'{core}'...")
-        cmd = [
-            "docker", "exec", "-it", SOLR_CONTAINER,
-            "sh", "-c", f"bin/solr post -c {core} {DATASET_FILE}"
-        ]
-        run_command(cmd)
-        print(f"✅ Docs enviados '{core}'\n")
+SOLR_URL = "http://localhost:8983/solr"
+CORES = ["simple", "songs"]
+DATASET_FILE = "dataset/dataset_mood.csv"  # saída de src/datasetMood.py (com os campos de humor)
+BATCH_SIZE = 1000
+SENDERS_PER_CORE = 4
+
+
+def make_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def iter_batches(dataset_file, batch_size):
+    """Lotes de documentos do CSV; linhas sem `id` usam `song_id` e valores vazios são omitidos."""
+    for chunk in pd.read_csv(dataset_file, chunksize=batch_size):
+        if "id" not in chunk.columns:
+            if "song_id" not in chunk.columns:
+                raise ValueError(f"'{dataset_file}' não tem coluna 'id' nem 'song_id'")
+            chunk = chunk.assign(id=chunk["song_id"])
+        docs = []
+        for record in chunk.to_dict("records"):
+            docs.append({k: v for k, v in record.items() if v is not None and not (isinstance(v, float) and math.isnan(v))})
+        yield docs
+
+
+def send_update(session, url, body, params=None, retries=3, timeout=120):
+    """POST JSON ao /update, com novas tentativas (backoff exponencial) em erros de rede/5xx."""
+    for attempt in range(retries + 1):
+        try:
+            r = session.post(url, data=body, params=params, timeout=timeout,
+                             headers={"Content-Type": "application/json"})
+            if r.status_code < 500:
+                r.raise_for_status()
+                return r
+            error = RuntimeError(f"{r.status_code} - {r.text[:200]}")
+        except requests.ConnectionError as e:
+            error = e
+        except requests.Timeout as e:
+            error = e
+        if attempt < retries:
+            time.sleep(min(30.0, 2 ** attempt) * random.uniform(0.5, 1.0))
+    raise RuntimeError(f"Falha ao enviar para {url}: {error}")
+
+
+def post_docs(solr_url=SOLR_URL, cores=CORES, dataset_file=DATASET_FILE, batch_size=BATCH_SIZE,
+              senders=SENDERS_PER_CORE, commit_within=None, commit=True, optimize=False, report_every=10):
+    """
+    Envia o dataset para todos os `cores` e devolve estatísticas por core
+    (docs, lotes, bytes, segundos, docs/s).
+
+    Sem `commit_within` não há commits durante a indexação: é feito um único
+    commit no fim (`commit`). Com `commit_within` (ms) é o Solr que decide.
+    """
+    session = make_session(senders * len(cores))
+    update_urls = {core: f"{solr_url.rstrip('/')}/{core}/update" for core in cores}
+    params = {"commitWithin": commit_within} if commit_within else None
+    stats = {core: {"docs": 0, "batches": 0, "bytes": 0} for core in cores}
+
+    start = time.perf_counter()
+    pending = {}
+    with ThreadPoolExecutor(max_workers=senders * len(cores)) as pool:
+
+        def collect(done):
+            for future in done:
+                core, n_docs, n_bytes = pending.pop(future)
+                future.result()
+                stats[core]["docs"] += n_docs
+                stats[core]["batches"] += 1
+                stats[core]["bytes"] += n_bytes
+                if stats[core]["batches"] % report_every == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"[{core}] {stats[core]['docs']} docs | {stats[core]['docs'] / elapsed:.0f} docs/s")
+
+        for docs in iter_batches(dataset_file, batch_size):
+            body = json.dumps(docs, ensure_ascii=False).encode("utf-8")
+            for core in cores:
+                future = pool.submit(send_update, session, update_urls[core], body, params)
+                pending[future] = (core, len(docs), len(body))
+            # no máximo 2 lotes por envio em curso, para a memória não crescer com o dataset
+            while len(pending) >= 2 * senders * len(cores):
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        collect(wait(pending).done)
+    index_seconds = time.perf_counter() - start
+
+    for core in cores:
+        if commit and not commit_within:
+            send_update(session, update_urls[core], b"{}", params={"commit": "true"})
+        if optimize:
+            send_update(session, update_urls[core], b"{}", params={"optimize": "true"})
+
+    total_seconds = time.perf_counter() - start
+    for core in cores:
+        s = stats[core]
+        s["seconds"] = round(total_seconds, 3)
+        s["docs_per_second"] = round(s["docs"] / index_seconds, 1) if index_seconds else None
+        print(f"✅ '{core}': {s['docs']} docs em {s['batches']} lotes "
+              f"({s['bytes'] / 1e6:.1f} MB) | {s['docs_per_second']} docs/s | total {s['seconds']}s")
+    return stats
+
 
 if __name__ == "__main__":
-    post_docs()
+    parser = argparse.ArgumentParser(description="Indexar o dataset nos cores do Solr")
+    parser.add_argument("--solr", default=SOLR_URL, help="URL base do Solr")
+    parser.add_argument("--cores", nargs="+", default=CORES, help="Cores a indexar")
+    parser.add_argument("--dataset", default=DATASET_FILE, help="CSV com os documentos")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Documentos por pedido")
+    parser.add_argument("--senders", type=int, default=SENDERS_PER_CORE, help="Envios em paralelo por core")
+    parser.add_argument("--commit-within", type=int, help="commitWithin (ms) em vez de um commit no fim")
+    parser.add_argument("--no-commit", action="store_true", help="Não fazer commit no fim")
+    parser.add_argument("--optimize", action="store_true", help="Optimize no fim")
+    args = parser.parse_args()
+
+    post_docs(args.solr, args.cores, args.dataset, args.batch_size, args.senders,
+              commit_within=args.commit_within, commit=not args.no_commit, optimize=args.optimize)
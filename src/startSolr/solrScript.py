@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
+import sys
 import requests
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 cores = [
@@ -53,31 +55,94 @@ def parse_schema(xml_path):
     return field_types, fields
 
 
-def add_to_solr(solr_url, field_types, fields):
-    """Send field types and fields to Solr via Schema API."""
-    for ft in field_types:
-        r = requests.post(solr_url, json={"add-field-type": ft})
-        print(f"[{solr_url}] Added field type '{ft['name']}': {r.status_code} - {r.text}")
+# Ordem de execução no pedido: os tipos antes dos campos que os usam
+_COMMAND_ORDER = ["add-field-type", "replace-field-type", "add-field", "replace-field"]
 
-    for f in fields:
-        r = requests.post(solr_url, json={"add-field": f})
-        print(f"[{solr_url}] Added field '{f['name']}': {r.status_code} - {r.text}")
+
+def _normalize(value):
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return None if value is None else str(value)
+
+
+def _matches(desired, live):
+    """True when `live` has every property of `desired` with the same value."""
+    if isinstance(desired, dict):
+        return isinstance(live, dict) and all(_matches(v, live.get(k)) for k, v in desired.items())
+    if isinstance(desired, list):
+        # GET /schema leaves out empty lists, e.g. "filters" of an analyzer without any
+        live = [] if live is None else live
+        return isinstance(live, list) and len(desired) == len(live) and all(map(_matches, desired, live))
+    return _normalize(desired) == _normalize(live)
 
 
-def parse_all():
-    for entry in cores:
-        print(f"Processing core '{entry['core']}' with schema '{entry['schema']}'...")
-        field_types, fields = parse_schema(entry["schema"])
-        add_to_solr(entry["url"], field_types, fields)
+def fetch_schema(session, solr_url):
+    """Schema atual do core (GET /schema)."""
+    r = session.get(solr_url, timeout=30)
+    r.raise_for_status()
+    return r.json()["schema"]
 
 
-def parse_one(entry):
+def diff_schema(field_types, fields, live_schema):
+    """Comandos da Schema API para levar o schema atual ao schema desejado (só o que muda)."""
+    live_types = {ft["name"]: ft for ft in live_schema.get("fieldTypes", [])}
+    live_fields = {f["name"]: f for f in live_schema.get("fields", [])}
+    commands = {}
+    for ft in field_types:
+        if ft["name"] not in live_types:
+            commands.setdefault("add-field-type", []).append(ft)
+        elif not _matches(ft, live_types[ft["name"]]):
+            commands.setdefault("replace-field-type", []).append(ft)
+    for f in fields:
+        if f["name"] not in live_fields:
+            commands.setdefault("add-field", []).append(f)
+        elif not _matches(f, live_fields[f["name"]]):
+            commands.setdefault("replace-field", []).append(f)
+    return {cmd: commands[cmd] for cmd in _COMMAND_ORDER if cmd in commands}
+
+
+def add_to_solr(solr_url, field_types, fields, session=None, dry_run=False):
+    """
+    Send field types and fields to Solr via Schema API.
+
+    Only what is missing or different from the live schema is sent, as a
+    single batched request. Returns the commands (empty if nothing changed).
+    """
+    session = session or requests.Session()
+    commands = diff_schema(field_types, fields, fetch_schema(session, solr_url))
+    summary = ", ".join(f"{cmd}: {', '.join(x['name'] for x in items)}" for cmd, items in commands.items())
+    if not commands:
+        print(f"[{solr_url}] Schema already up to date")
+        return commands
+    if dry_run:
+        print(f"[{solr_url}] Would send {summary}")
+        return commands
+
+    r = session.post(solr_url, json=commands, timeout=60)
+    print(f"[{solr_url}] {summary}: {r.status_code}")
+    if r.status_code != 200:
+        raise RuntimeError(f"[{solr_url}] Schema update failed: {r.status_code} - {r.text}")
+    return commands
+
+
+def parse_all(dry_run=False):
+    """Provision every core concurrently, one round-trip per core."""
+    session = requests.Session()
+    with ThreadPoolExecutor(max_workers=len(cores)) as pool:
+        futures = {pool.submit(parse_one, entry, session, dry_run): entry["core"] for entry in cores}
+        results = {futures[f]: f.result() for f in as_completed(futures)}
+    return results
+
+
+def parse_one(entry, session=None, dry_run=False):
     print(f"Processing core '{entry['core']}' with schema '{entry['schema']}'...")
     field_types, fields = parse_schema(entry["schema"])
-    add_to_solr(entry["url"], field_types, fields)
+    return add_to_solr(entry["url"], field_types, fields, session=session, dry_run=dry_run)
 
 
 if __name__ == "__main__":
-    parse_all()
-
-
+    parse_all(dry_run="--dry-run" in sys.argv)
@@ -0,0 +1,167 @@
+"""Read and write the pipeline tables as CSV or Parquet.
+
+A path ending in ".parquet" is stored as Parquet (requires pyarrow), anything
+else as CSV. Parquet tables written by `TableAppender` are directories of part
+files, one per run, with one row group per appended chunk; `read_table` reads
+both single files and such directories and can load only some columns.
+"""
+
+import os
+import shutil
+from typing import Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+# optional Parquet support
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.dataset as ds  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+    _HAS_PYARROW = True
+except Exception:
+    pa = None  # type: ignore
+    ds = None  # type: ignore
+    pq = None  # type: ignore
+    _HAS_PYARROW = False
+
+
+def is_parquet(path: str) -> bool:
+    return str(path).lower().endswith(".parquet")
+
+
+def _require_pyarrow() -> None:
+    if not _HAS_PYARROW:
+        raise ImportError("pyarrow não está instalado. Instale com: pip install pyarrow")
+
+
+def with_suffix(path: str, suffix: str) -> str:
+    """Insert `suffix` before the extension, e.g. out.csv -> out_artists.csv."""
+    root, ext = os.path.splitext(path)
+    return f"{root}{suffix}{ext}"
+
+
+def remove_table(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def table_columns(path: str) -> List[str]:
+    """Column names of a CSV or Parquet table, without reading its rows."""
+    if is_parquet(path):
+        _require_pyarrow()
+        return list(ds.dataset(path, format="parquet").schema.names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_table(path: str, columns: Optional[List[str]] = None, **csv_kwargs) -> pd.DataFrame:
+    """Load a CSV or Parquet table, optionally only the given columns.
+
+    For Parquet only the requested columns are read from disk; for CSV they
+    are selected while parsing (`usecols`). Extra keyword arguments are passed
+    to `pd.read_csv`.
+    """
+    if is_parquet(path):
+        _require_pyarrow()
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns, **csv_kwargs)
+
+
+def iter_table(path: str, chunksize: int, columns: Optional[List[str]] = None, **csv_kwargs) -> Iterator[pd.DataFrame]:
+    """Yield a CSV or Parquet table as DataFrames of at most `chunksize` rows."""
+    if is_parquet(path):
+        _require_pyarrow()
+        for batch in ds.dataset(path, format="parquet").to_batches(columns=columns, batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+    yield from pd.read_csv(path, usecols=columns, chunksize=chunksize, **csv_kwargs)
+
+
+def compact_dtypes(
+    df: pd.DataFrame,
+    categorical: Iterable[str] = (),
+    ids: Iterable[str] = (),
+    text: Iterable[str] = (),
+) -> pd.DataFrame:
+    """Return `df` with memory-compact dtypes for the listed columns.
+
+    - categorical: repeated labels (album/artist names) become `category`
+    - ids: integer ids become int32 (nullable Int32 if values are missing);
+      columns holding non-numeric, fractional or >= 2**31 ids are left alone
+    - text: long free text (lyrics, bios) becomes Arrow-backed strings when
+      pyarrow is installed
+
+    Columns not present in `df` are skipped.
+    """
+    out = df.copy(deep=False)
+    for col in categorical:
+        if col in out.columns:
+            out[col] = out[col].astype("category")
+    for col in ids:
+        if col not in out.columns:
+            continue
+        try:
+            values = pd.to_numeric(out[col])
+        except (ValueError, TypeError):
+            continue
+        present = values.dropna()
+        # only whole numbers that fit in 32 bits; anything else stays as it was
+        if not (present % 1 == 0).all() or (len(present) and present.abs().max() >= 2**31):
+            continue
+        out[col] = values.astype("Int32" if len(present) < len(values) else "int32")
+    if _HAS_PYARROW:
+        for col in text:
+            if col in out.columns:
+                out[col] = out[col].astype("string[pyarrow]")
+    return out
+
+
+def write_table(df: pd.DataFrame, path: str) -> None:
+    """Write a whole DataFrame as CSV or a single Parquet file."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    if is_parquet(path):
+        _require_pyarrow()
+        remove_table(path)
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, encoding="utf-8")
+
+
+class TableAppender:
+    """Append DataFrame chunks to a CSV file or a Parquet dataset directory.
+
+    CSV chunks are appended with a header only when the file is new or empty.
+    For Parquet a new part file is opened in the `path` directory and every
+    chunk becomes one row group; all columns are stored as strings so chunks
+    always share a schema. Call `close` to finalize the part file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._parquet = is_parquet(path)
+        self._writer = None
+        self._schema = None
+        if self._parquet:
+            _require_pyarrow()
+
+    def append(self, df: pd.DataFrame) -> None:
+        if not self._parquet:
+            write_header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            df.to_csv(self.path, mode='a', header=write_header, index=False, encoding='utf-8')
+            return
+
+        if self._writer is None:
+            os.makedirs(self.path, exist_ok=True)
+            part = len([f for f in os.listdir(self.path) if f.endswith(".parquet")])
+            self._schema = pa.schema([(str(c), pa.string()) for c in df.columns])
+            self._writer = pq.ParquetWriter(os.path.join(self.path, f"part-{part:05d}.parquet"), self._schema)
+        # nulls stay null, everything else is stored as text
+        as_text = df.astype(object).where(df.notna(), None).apply(lambda col: col.map(lambda v: v if v is None else str(v)))
+        self._writer.write_table(pa.Table.from_pandas(as_text, schema=self._schema, preserve_index=False))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
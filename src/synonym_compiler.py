@@ -0,0 +1,195 @@
+"""Compile a Solr synonyms file against the indexed corpus.
+
+The WordNet output (json_to_txt / convert.py) has ~30k lines and every one
+of them is applied with expand="true" at index and query time. This script
+keeps only what can matter for our data:
+
+- terms (or every word of a phrase) that occur in the corpus in at least
+  `min_df` documents
+- no expansion for terms present in more than `max_df` of the documents
+- at most `max_expansions` synonyms per term, the most frequent ones
+- term groups where every member expands to all the others are written as
+  one equivalence line ("a, b, c"); other expansions as "a => a, b"
+
+and reports how many extra tokens the file adds to the index (expected
+token blow-up) before and after compiling, so it can be checked before the
+file is copied to the cores.
+
+    python src/synonym_compiler.py solr/synonyms.txt solr/synonyms_compiled.txt \
+        --corpus finalDataset/dataset.csv --max-expansions 10
+"""
+
+import argparse
+import json
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from storage_utils import iter_table, table_columns
+from term_utils import TermCounter, tokenize
+
+# fields analysed with SynonymGraphFilter in solr/schema2.xml
+SYNONYM_FIELDS = ['song_lyrics', 'artist_bio', 'song_name', 'album_name', 'artist_name']
+
+
+def _split_terms(part: str) -> List[str]:
+    # "\," is an escaped comma inside a term
+    terms = [t.replace("\0", ",") for t in part.replace("\\,", "\0").split(",")]
+    return [" ".join(t.lower().split()) for t in terms if t.strip()]
+
+
+def parse_synonyms(lines: Iterable[str]) -> Tuple[List[List[str]], List[Tuple[List[str], List[str]]]]:
+    """Split Solr synonym rules into equivalence groups and explicit "a, b => c" mappings."""
+    groups, mappings = [], []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if "=>" in line:
+            lhs, rhs = line.split("=>", 1)
+            mappings.append((_split_terms(lhs), _split_terms(rhs)))
+        else:
+            terms = _split_terms(line)
+            if len(terms) > 1:
+                groups.append(terms)
+    return groups, mappings
+
+
+def expansions_of(groups: Iterable[List[str]]) -> Dict[str, Set[str]]:
+    """What each term expands to with expand="true": the union of its groups, minus itself."""
+    expansions: Dict[str, Set[str]] = defaultdict(set)
+    for group in groups:
+        members = set(group)
+        for term in members:
+            expansions[term] |= members - {term}
+    return expansions
+
+
+def count_corpus(path: str, columns: Optional[List[str]] = None, chunksize: int = 20_000) -> TermCounter:
+    """Term and document frequencies of the corpus, one document per row (all columns together)."""
+    present = [c for c in (columns or SYNONYM_FIELDS) if c in table_columns(path)]
+    if not present:
+        raise ValueError(f"Nenhuma das colunas {columns or SYNONYM_FIELDS} existe em '{path}'")
+    counter = TermCounter(track_documents=True)
+    for chunk in iter_table(path, chunksize, columns=present):
+        docs = chunk[present[0]].fillna("").astype(str)
+        for col in present[1:]:
+            docs = docs + " " + chunk[col].fillna("").astype(str)
+        counter.update(docs)
+    return counter
+
+
+class _Stats:
+    """Collection/document frequency of terms and phrases (phrases: min over their words, an upper bound)."""
+
+    def __init__(self, counter: TermCounter):
+        self.counter = counter
+
+    def _words(self, term: str) -> List[str]:
+        return tokenize(term) or [term]
+
+    def tf(self, term: str) -> int:
+        return min(self.counter.counts.get(w, 0) for w in self._words(term))
+
+    def df(self, term: str) -> int:
+        return min(self.counter.document_counts.get(w, 0) for w in self._words(term))
+
+
+def _extra_tokens(expansions: Dict[str, Set[str]], mappings, stats: _Stats) -> int:
+    extra = sum(stats.tf(t) * len(syns) for t, syns in expansions.items())
+    extra += sum(stats.tf(t) * (len(rhs) - 1) for lhs, rhs in mappings for t in lhs)
+    return extra
+
+
+def compile_synonyms(
+    input_path: str,
+    output_path: str,
+    corpus: TermCounter,
+    min_df: int = 1,
+    max_df: float = 0.5,
+    max_expansions: Optional[int] = 10,
+) -> Dict[str, float]:
+    """Prune, cap and collapse `input_path` into `output_path`; returns the report."""
+    with open(input_path, "r", encoding="utf-8") as f:
+        groups, mappings = parse_synonyms(f)
+
+    stats = _Stats(corpus)
+    before = expansions_of(groups)
+    max_docs = max_df * corpus.documents
+
+    # 1. only terms that occur in the corpus
+    keep = {t for t in set(before) | {s for syns in before.values() for s in syns} if stats.df(t) >= min_df}
+    after: Dict[str, Set[str]] = {}
+    for term, syns in before.items():
+        # 2. very common terms are not expanded (their synonyms can still point to them)
+        if term not in keep or stats.df(term) > max_docs:
+            continue
+        syns = syns & keep
+        # 3. cap the fan-out, keeping the most frequent synonyms
+        if max_expansions is not None and len(syns) > max_expansions:
+            syns = set(sorted(syns, key=lambda s: (-stats.df(s), s))[:max_expansions])
+        if syns:
+            after[term] = syns
+    kept_mappings = [
+        (lhs_kept, rhs)
+        for lhs, rhs in mappings
+        for lhs_kept in [[t for t in lhs if t in keep or stats.df(t) >= min_df]]
+        if lhs_kept
+    ]
+
+    # 4. equivalence classes: groups where every member expands to all the others
+    lines, done = [], set()
+    for term in sorted(after):
+        if term in done:
+            continue
+        group = after[term] | {term}
+        if all(after.get(m, set()) | {m} == group for m in group):
+            lines.append(", ".join(sorted(group)))
+            done |= group
+        else:
+            lines.append(f"{term} => " + ", ".join([term] + sorted(after[term])))
+            done.add(term)
+    for lhs, rhs in kept_mappings:
+        lines.append(", ".join(lhs) + " => " + ", ".join(rhs))
+
+    tokens = max(corpus.tokens, 1)
+    extra_before = _extra_tokens(before, mappings, stats)
+    extra_after = _extra_tokens(after, kept_mappings, stats)
+    report = {
+        "rules_in": len(groups) + len(mappings),
+        "rules_out": len(lines),
+        "terms_in": len(before),
+        "terms_out": len(after),
+        "terms_not_in_corpus": len([t for t in before if t not in keep]),
+        "terms_too_common": len([t for t in before if t in keep and stats.df(t) > max_docs]),
+        "max_expansions_in": max((len(s) for s in before.values()), default=0),
+        "max_expansions_out": max((len(s) for s in after.values()), default=0),
+        "corpus_documents": corpus.documents,
+        "corpus_tokens": corpus.tokens,
+        "extra_tokens_in": extra_before,
+        "extra_tokens_out": extra_after,
+        "token_blowup_in": round((tokens + extra_before) / tokens, 3),
+        "token_blowup_out": round((tokens + extra_after) / tokens, 3),
+    }
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(f"# compiled from {input_path}: {report['rules_out']} rules, "
+                f"expected token blow-up x{report['token_blowup_out']} (was x{report['token_blowup_in']})\n")
+        f.write("\n".join(lines) + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compilar um ficheiro de sinónimos do Solr contra o corpus")
+    parser.add_argument("input", help="Ficheiro de sinónimos (formato Solr)")
+    parser.add_argument("output", help="Ficheiro de sinónimos compilado")
+    parser.add_argument("--corpus", required=True, help="Dataset indexado (CSV/Parquet)")
+    parser.add_argument("--columns", nargs="*", help=f"Colunas do corpus (por omissão {SYNONYM_FIELDS})")
+    parser.add_argument("--min-df", type=int, default=1, help="Mínimo de documentos em que o termo aparece")
+    parser.add_argument("--max-df", type=float, default=0.5, help="Fração máxima de documentos para expandir um termo")
+    parser.add_argument("--max-expansions", type=int, default=10, help="Máximo de sinónimos por termo (0 = sem limite)")
+    args = parser.parse_args()
+
+    corpus = count_corpus(args.corpus, args.columns)
+    report = compile_synonyms(args.input, args.output, corpus, min_df=args.min_df, max_df=args.max_df,
+                              max_expansions=args.max_expansions or None)
+    print(json.dumps(report, indent=2))
@@ -1,11 +1,14 @@
+import re
 import string
 import nltk
 from nltk.corpus import wordnet, stopwords
-import pandas as pd
-import string
-from nltk.tokenize import word_tokenize
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+
+from storage_utils import iter_table, table_columns
 
 
 def get_wordnet_synonyms(word):
@@ -67,18 +70,77 @@ def generate_synonyms_from_txt(input_filename, output_filename):
 
 
 
-def get_synonyms(word, pos_tags=[wordnet.NOUN, wordnet.VERB]):
+# wordnet.NOUN / wordnet.VERB; written as literals so importing this module
+# does not load the WordNet corpus
+DEFAULT_POS = ("n", "v")
+
+# runs of letters, joined across hyphens (rock-n-roll -> rocknroll once the
+# punctuation is removed) and split at apostrophes (love's -> love, s), close
+# to what word_tokenize + translate produced before
+_WORD_RE = re.compile(r"[^\W\d_]+(?:-[^\W\d_]+)*")
+
+
+@lru_cache(maxsize=None)
+def _cached_synonyms(word_lower, pos_tags):
     synonyms = set()
-    word_lower = word.lower()
     for pos in pos_tags:
         for syn in wordnet.synsets(word_lower, pos=pos):
             for lemma in syn.lemmas():
                 synonym_candidate = lemma.name().replace("_", " ").lower()
                 if synonym_candidate != word_lower:
                     synonyms.add(synonym_candidate)
-    return list(synonyms)
+    return tuple(sorted(synonyms))
+
+
+def get_synonyms(word, pos_tags=DEFAULT_POS):
+    """Sinónimos WordNet de `word` (memoizado por palavra e POS)."""
+    return list(_cached_synonyms(word.lower(), tuple(pos_tags)))
+
+
+def _ensure_nltk_resource(resource, name, download_dir):
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        nltk.download(name, download_dir=download_dir, quiet=True)
 
-def generate_wordnet_synonyms(input_csv, output_file, columns=None, pos_tags=[wordnet.NOUN, wordnet.VERB]):
+
+def _init_wordnet_worker(nltk_data_path):
+    if nltk_data_path not in nltk.data.path:
+        nltk.data.path.append(nltk_data_path)
+    wordnet.ensure_loaded()
+
+
+def _synonyms_batch(words, pos_tags):
+    return [(word, get_synonyms(word, pos_tags)) for word in words]
+
+
+def collect_vocabulary(input_csv, columns, stop_words, chunksize=20_000):
+    """Palavras distintas (minúsculas, só letras, sem stopwords) das colunas indicadas."""
+    present = [c for c in columns if c in table_columns(input_csv)]
+    translator = str.maketrans('', '', string.punctuation)
+    tokens = set()
+    for chunk in iter_table(input_csv, chunksize, columns=present):
+        for col in present:
+            texts = chunk[col].dropna().astype(str)
+            tokens.update(chain.from_iterable(_WORD_RE.findall(t.lower()) for t in texts))
+    # limpeza uma vez por token distinto
+    vocabulary = set()
+    for token in tokens:
+        cleaned_word = token.translate(translator)
+        if cleaned_word.isalpha() and cleaned_word not in stop_words:
+            vocabulary.add(cleaned_word)
+    return vocabulary
+
+
+def generate_wordnet_synonyms(input_csv, output_file, columns=None, pos_tags=DEFAULT_POS,
+                              n_jobs=None, chunksize=20_000, batch_size=500):
+    """
+    Gera um JSON {palavra: [sinónimos]} com o vocabulário das colunas indicadas.
+
+    O CSV/Parquet é lido em blocos e só o vocabulário distinto é consultado
+    no WordNet, em paralelo por `n_jobs` processos (None = todos os cores,
+    1 = sem processos).
+    """
     if columns is None:
         columns = ['song_name', 'album_name', 'song_lyrics', 'artist_bio']
 
@@ -86,39 +148,32 @@ def generate_wordnet_synonyms(input_csv, output_file, columns=None, pos_tags=[wo
     if not os.path.exists(input_csv):
         raise FileNotFoundError(f"{input_csv} not found!")
 
-    # Download NLTK resources
+    # Download NLTK resources (só os que faltam)
     nltk_data_path = os.path.expanduser('~/nltk_data')
     nltk.data.path.append(nltk_data_path)
-
-    # Baixar recursos necessários
-    nltk.download('punkt', download_dir=nltk_data_path, quiet=True)   # tokenizador
-    nltk.download('punkt_tab', download_dir=nltk_data_path, quiet=True)  # evita erro punkt_tab
-    nltk.download('wordnet', download_dir=nltk_data_path, quiet=True)
-    nltk.download('omw-1.4', download_dir=nltk_data_path, quiet=True)
-    nltk.download('stopwords', download_dir=nltk_data_path, quiet=True)
+    _ensure_nltk_resource('corpora/wordnet', 'wordnet', nltk_data_path)
+    _ensure_nltk_resource('corpora/omw-1.4', 'omw-1.4', nltk_data_path)
+    _ensure_nltk_resource('corpora/stopwords', 'stopwords', nltk_data_path)
     stop_words = set(stopwords.words('english'))
-    translator = str.maketrans('', '', string.punctuation)
-    print("✅ NLTK resources downloaded.")
-    df = pd.read_csv(input_csv)
-    all_words = set()
-
-    for col in columns:
-        if col not in df.columns:
-            continue
-        for text in df[col]:
-            tokens = word_tokenize(str(text))
-            for word in tokens:
-                cleaned_word = word.lower().translate(translator)
-                if cleaned_word.isalpha() and cleaned_word not in stop_words:
-                    all_words.add(cleaned_word)
-                    print(f"Collected word: {cleaned_word}")
-
-    synonyms_mapping = {}
-    for word in sorted(all_words):
-        syns = get_synonyms(word, pos_tags)
-        print(f"Word: '{word}' | Synonyms found: {len(syns)}")
-        if syns:
-            synonyms_mapping[word] = syns
+    print("✅ NLTK resources ready.")
+
+    words = sorted(collect_vocabulary(input_csv, columns, stop_words, chunksize=chunksize))
+    print(f"Collected {len(words)} distinct words.")
+
+    pos_tags = tuple(pos_tags)
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs <= 1 or len(words) <= batch_size:
+        results = _synonyms_batch(words, pos_tags)
+    else:
+        batches = [words[i:i + batch_size] for i in range(0, len(words), batch_size)]
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_wordnet_worker,
+                                 initargs=(nltk_data_path,)) as pool:
+            results = list(chain.from_iterable(
+                pool.map(_synonyms_batch, batches, [pos_tags] * len(batches))
+            ))
+
+    synonyms_mapping = {word: syns for word, syns in results if syns}
 
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(synonyms_mapping, f, indent=4, ensure_ascii=False)
@@ -0,0 +1,191 @@
+"""Streaming term frequencies over a text column (lyrics, bios).
+
+`count_terms` reads one column of a CSV/Parquet table chunk by chunk and
+feeds it to a `TermCounter`, which tokenizes with the same pattern as
+WordCloud (words = \\w[\\w']*), lowercases, strips a trailing "'s" and
+then drops stopwords and numbers. Counts are exact (a Counter) by
+default; with `max_terms` they go to a count-min sketch and only the
+`max_terms` most frequent candidates are kept, so memory stays bounded
+whatever the vocabulary size.
+"""
+
+import re
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from storage_utils import iter_table
+
+_TOKEN_RE = re.compile(r"\w[\w']*")
+
+# Palavras sem significado temático, além das STOPWORDS do wordcloud
+EXTRA_STOPWORDS = frozenset([
+    # Verbos auxiliares
+    "am", "is", "are", "was", "be", "been", "being",
+    "do", "does", "did", "doing",
+    "have", "has", "had", "having",
+
+    # Verbos muito genéricos / comuns em narrativas
+    "put", "keep", "kept", "hold", "leave", "bring",
+    "move", "run", "walk", "stand", "sit",
+    "turn", "start", "stop", "work", "live",
+    "look", "watch", "hear", "listen",
+    "talk", "speak", "call", "try", "tryin",
+    "help", "show", "find", "found",
+    "lose", "lost", "stay", "play",
+
+    # Verbos modais
+    "can", "cant", "could", "couldnt",
+    "should", "shouldnt", "would", "wouldnt",
+    "may", "might", "must",
+
+    # Verbos de estado genéricos
+    "feel", "felt", "seem", "seemed",
+    "happen", "happens",
+
+    # Contractions comuns
+    "dont", "doesnt", "didnt",
+    "isnt", "arent", "wasnt", "werent",
+    "havent", "hasnt", "hadnt",
+    "imma",
+
+    # Palavras funcionais adicionais (não tem significado temático)
+    "into", "onto", "upon", "through",
+    "while", "without", "within",
+    "cause", "cuz", "cos", "because",
+    "maybe", "really", "just", "only",
+
+    # Fillers comuns em música
+    "ya", "yall", "huh", "hmm", "hahaha",
+    "whoa", "woah", "uhhuh", "nah",
+
+    # Tempo genérico (sem eliminar temas como "night" ou "morning")
+    "time", "times", "moment",
+])
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words of `text`, with the same pattern TermCounter uses."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class _CountMinSketch:
+    """Count-min sketch over strings (depth x width int64 counters)."""
+
+    def __init__(self, width: int, depth: int):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _columns(self, keys: np.ndarray) -> List[np.ndarray]:
+        # double hashing: h1 + i * h2, with h2 odd
+        h1 = pd.util.hash_array(keys, hash_key="term-counter-h1x", categorize=False)
+        h2 = pd.util.hash_array(keys, hash_key="term-counter-h2x", categorize=False) | np.uint64(1)
+        return [((h1 + np.uint64(i) * h2) % np.uint64(self.width)).astype(np.int64) for i in range(self.depth)]
+
+    def add(self, keys: np.ndarray, counts: np.ndarray) -> None:
+        for row, cols in enumerate(self._columns(keys)):
+            np.add.at(self.table[row], cols, counts)
+
+    def estimate(self, keys: np.ndarray) -> np.ndarray:
+        cols = self._columns(keys)
+        return np.min([self.table[row, c] for row, c in enumerate(cols)], axis=0)
+
+
+class TermCounter:
+    """Term frequencies accumulated over any number of text chunks.
+
+    Besides the term counts it keeps `documents` (non-empty texts seen) and
+    `tokens` (terms counted after filtering), for other corpus statistics.
+    With `track_documents` it also keeps `document_counts`, the number of
+    texts each term appears in (exact mode only).
+    """
+
+    def __init__(
+        self,
+        stopwords: Iterable[str] = (),
+        max_terms: Optional[int] = None,
+        sketch_width: int = 1 << 18,
+        sketch_depth: int = 4,
+        track_documents: bool = False,
+    ):
+        if track_documents and max_terms:
+            raise ValueError("track_documents só é suportado sem max_terms (contagem exata).")
+        self.stopwords = frozenset(w.lower() for w in stopwords)
+        self.max_terms = max_terms
+        self.documents = 0
+        self.tokens = 0
+        self.counts: Counter = Counter()
+        self.document_counts: Optional[Counter] = Counter() if track_documents else None
+        self._sketch = _CountMinSketch(sketch_width, sketch_depth) if max_terms else None
+
+    def _normalize(self, word: str) -> Optional[str]:
+        # same order as WordCloud.process_text: "time's" -> "time", then the stopword check
+        if word.endswith("'s"):
+            word = word[:-2]
+        if not word or word.isdigit() or word in self.stopwords:
+            return None
+        return word
+
+    def update(self, texts: Iterable) -> None:
+        texts = [t for t in texts if isinstance(t, str) and t.strip() != ""]
+        self.documents += len(texts)
+        # Counter counts the token stream in C; filtering runs once per distinct token
+        token_lists = [_TOKEN_RE.findall(t.lower()) for t in texts]
+        raw = Counter(chain.from_iterable(token_lists))
+        norm = {word: self._normalize(word) for word in raw}
+        chunk: Counter = Counter()
+        for word, n in raw.items():
+            if norm[word]:
+                chunk[norm[word]] += n
+        if self.document_counts is not None:
+            docs = Counter(chain.from_iterable({norm[w] for w in tokens} for tokens in token_lists))
+            docs.pop(None, None)
+            self.document_counts.update(docs)
+        self.tokens += sum(chunk.values())
+        if self._sketch is None:
+            self.counts.update(chunk)
+            return
+        if not chunk:
+            return
+
+        self._sketch.add(np.array(list(chunk), dtype=object), np.fromiter(chunk.values(), dtype=np.int64))
+        candidates = np.array(list(set(chunk) | set(self.counts)), dtype=object)
+        estimates = self._sketch.estimate(candidates)
+        keep = np.argsort(-estimates, kind="stable")[:self.max_terms]
+        self.counts = Counter({candidates[i]: int(estimates[i]) for i in keep})
+
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        return self.counts.most_common(n)
+
+    def frequencies(self, n: Optional[int] = None, normalize_plurals: bool = True) -> Dict[str, int]:
+        """The `n` most frequent terms as {term: count}, for WordCloud.generate_from_frequencies.
+
+        With `normalize_plurals`, "words" is merged into "word" when both were
+        seen (as WordCloud does).
+        """
+        counts = self.counts
+        if normalize_plurals:
+            counts = Counter()
+            for word, c in self.counts.items():
+                if word.endswith("s") and not word.endswith("ss") and word[:-1] in self.counts:
+                    word = word[:-1]
+                counts[word] += c
+        return dict(counts.most_common(n))
+
+
+def count_terms(
+    path: str,
+    text_column: str,
+    chunksize: int = 50_000,
+    stopwords: Iterable[str] = (),
+    max_terms: Optional[int] = None,
+) -> TermCounter:
+    """Count the terms of `text_column` of a CSV/Parquet table, `chunksize` rows at a time."""
+    counter = TermCounter(stopwords=stopwords, max_terms=max_terms)
+    for chunk in iter_table(path, chunksize, columns=[text_column]):
+        counter.update(chunk[text_column])
+    return counter
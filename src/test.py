@@ -8,6 +8,7 @@ os.makedirs(process_dir, exist_ok=True)
 csv_path = r"c:\FEUP\MEIC\PRI\dataset\spotify_millsongdata.csv"
 out_csv_path = os.path.join(process_dir, "spotify_millsongdata_with_lastfm.csv")
 progress_file = os.path.join(process_dir, "lastfm_progress.json")
+response_cache_path = os.path.join(process_dir, "lastfm_responses.sqlite")
 
 augment_csv_with_lastfm(
     csv_path,
@@ -15,7 +16,9 @@ augment_csv_with_lastfm(
     overwrite=False,         
     chunk_size=200,         
     progress_file=progress_file,
-    sleep_between_calls=0.2  
+    sleep_between_calls=0.2,
+    response_cache_path=response_cache_path,
+    plan_entities=True,
 )
 
 print("Processamento completo!")
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from data_utils import BIO_NULL, classify_artist_bios, process_dataFinal, process_dataFinal_chunked
+
+
+def test_classify_artist_bios_all_empty_float_column():
+    codes, cleaned = classify_artist_bios(pd.Series([np.nan, np.nan], name="artist_bio"))
+    assert codes.tolist() == [BIO_NULL, BIO_NULL]
+    assert cleaned.isna().all()
+
+
+def test_chunked_matches_unchunked_with_all_empty_bio_chunk(tmp_path):
+    artists = pd.DataFrame({
+        "id": [1, 2, 3, 4],
+        "artist_name": ["a", "b", "c", "d"],
+        "artist_bio": ["Bio a. Read more on Last.fm", "Bio b", None, None],
+    })
+    songs = pd.DataFrame({
+        "artist_id": [1, 2, 3, 4, 1],
+        "song_name": ["s1", "s2", "s3", "s4", "s5"],
+        "album_name": ["x", "Single", None, "y", "z"],
+    })
+    artist_path, song_path = tmp_path / "artists.csv", tmp_path / "songs.csv"
+    artists.to_csv(artist_path, index=False)
+    songs.to_csv(song_path, index=False)
+
+    # the second chunk (artists 3 and 4) has only empty bios
+    counts = process_dataFinal_chunked(artist_path, song_path, tmp_path / "a_out.csv", tmp_path / "s_out.csv",
+                                       chunksize=2)
+    artist_ref, song_ref = process_dataFinal(pd.read_csv(artist_path), pd.read_csv(song_path))
+
+    assert counts["artists_out"] == len(artist_ref) == 2
+    assert pd.read_csv(tmp_path / "a_out.csv")["artist_bio"].tolist() == artist_ref["artist_bio"].tolist()
+    assert pd.read_csv(tmp_path / "s_out.csv")["song_name"].tolist() == song_ref["song_name"].tolist()
@@ -0,0 +1,10 @@
+import pytest
+
+from bench_imports import HEAVY, MODULES, measure
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_module_does_not_import_heavy_libraries(module):
+    # fresh interpreter per module, same probe as scripts/bench_imports.py
+    _, _, heavy = measure(module, repeat=1)
+    assert heavy == [], f"import {module} loaded {heavy}; import them inside the functions that need them"
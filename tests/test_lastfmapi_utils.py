@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+import lastfmapi_utils
+
+
+class Crash(Exception):
+    pass
+
+
+def _fake_lastfm(monkeypatch):
+    monkeypatch.setattr(lastfmapi_utils, "search_track", lambda song, artist: None)
+    monkeypatch.setattr(lastfmapi_utils, "get_artist_info",
+                        lambda artist_name=None, artist_mbid=None: (f"bio of {artist_name}", 1, artist_name))
+    monkeypatch.setattr(lastfmapi_utils, "get_track_info",
+                        lambda track_name=None, artist_name=None, track_mbid=None: ("", None, 0, f"album {track_name}"))
+
+
+def test_resume_after_crash_before_chunk_is_written(tmp_path, monkeypatch):
+    _fake_lastfm(monkeypatch)
+    csv_path = tmp_path / "songs.csv"
+    pd.DataFrame({"artist": [f"artist {i}" for i in range(6)],
+                  "song": [f"song {i}" for i in range(6)]}).to_csv(csv_path, index=False)
+    out_path = tmp_path / "out" / "songs_lastfm.csv"
+    progress = tmp_path / "out" / "progress.json"
+
+    appender = lastfmapi_utils.TableAppender
+
+    class CrashingAppender(appender):
+        songs_appends = 0
+
+        def append(self, df):
+            if self.path == str(out_path):
+                CrashingAppender.songs_appends += 1
+                if CrashingAppender.songs_appends == 2:
+                    raise Crash()
+            super().append(df)
+
+    kwargs = dict(out_csv_path=str(out_path), chunk_size=2, progress_file=str(progress), sleep_between_calls=0)
+    monkeypatch.setattr(lastfmapi_utils, "TableAppender", CrashingAppender)
+    with pytest.raises(Crash):
+        lastfmapi_utils.augment_csv_with_lastfm(str(csv_path), **kwargs)
+
+    # the second chunk never reached the output, so neither did the progress
+    assert lastfmapi_utils._load_progress(str(progress))[0] == 2
+
+    monkeypatch.setattr(lastfmapi_utils, "TableAppender", appender)
+    lastfmapi_utils.augment_csv_with_lastfm(str(csv_path), **kwargs)
+
+    songs = pd.read_csv(out_path)
+    artists = pd.read_csv(tmp_path / "out" / "songs_lastfm_artists.csv")
+    assert songs["song"].tolist() == [f"song {i}" for i in range(6)]
+    assert sorted(artists["artist"]) == [f"artist {i}" for i in range(6)]
+
+
+def test_response_cache_is_closed_after_run(tmp_path, monkeypatch):
+    _fake_lastfm(monkeypatch)
+    csv_path = tmp_path / "songs.csv"
+    pd.DataFrame({"artist": ["a"], "song": ["s"]}).to_csv(csv_path, index=False)
+    closed = []
+    monkeypatch.setattr(lastfmapi_utils._ResponseCache, "close", lambda self: closed.append(self.path))
+
+    lastfmapi_utils.augment_csv_with_lastfm(
+        str(csv_path), out_csv_path=str(tmp_path / "out.csv"), progress_file=str(tmp_path / "progress.json"),
+        sleep_between_calls=0, response_cache_path=str(tmp_path / "responses.sqlite"),
+    )
+    assert closed == [str(tmp_path / "responses.sqlite")]
+    assert lastfmapi_utils._response_cache is None
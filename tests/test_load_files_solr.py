@@ -0,0 +1,101 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+import load_files_solr
+
+
+class FakeUpdateHandler(BaseHTTPRequestHandler):
+    """/solr/<core>/update that records every request and fails the first `fail_first` with 503."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        core = url.path.split("/")[2]
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            if server.fail_first > 0:
+                server.fail_first -= 1
+                code = 503
+            else:
+                code = 200
+                server.requests.append((core, params, body))
+        data = json.dumps({"responseHeader": {"status": 0 if code == 200 else 1}}).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def solr(monkeypatch):
+    monkeypatch.setattr(load_files_solr.time, "sleep", lambda seconds: None)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeUpdateHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.fail_first = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_port}/solr"
+    server.shutdown()
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    path = tmp_path / "dataset.csv"
+    pd.DataFrame({
+        "song_id": range(1, 11),
+        "song_name": [f"song {i}" for i in range(1, 11)],
+        "album_name": [None if i % 3 == 0 else f"album {i}" for i in range(1, 11)],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def _split(requests):
+    docs = [(core, body) for core, params, body in requests if isinstance(body, list)]
+    control = [(core, params) for core, params, body in requests if not isinstance(body, list)]
+    return docs, control
+
+
+def test_post_docs_batches_retry_and_single_commit(solr, dataset):
+    server, url = solr
+    server.fail_first = 1  # the first batch gets a 503 and is sent again
+
+    stats = load_files_solr.post_docs(url, ["simple", "songs"], dataset, batch_size=4, senders=2)
+
+    docs, control = _split(server.requests)
+    for core in ["simple", "songs"]:
+        batches = [body for c, body in docs if c == core]
+        assert sorted(len(b) for b in batches) == [2, 4, 4]
+        sent = sorted((d for b in batches for d in b), key=lambda d: d["id"])
+        assert [d["id"] for d in sent] == list(range(1, 11))
+        # empty values are left out of the documents
+        assert "album_name" not in sent[2]
+        assert stats[core]["docs"] == 10 and stats[core]["batches"] == 3
+    # exactly one commit per core, after all the batches, and no optimize
+    assert sorted(control) == [("simple", {"commit": "true"}), ("songs", {"commit": "true"})]
+    assert all(isinstance(body, list) for _, _, body in server.requests[:-2])
+
+
+def test_post_docs_optimize(solr, dataset):
+    server, url = solr
+    load_files_solr.post_docs(url, ["songs"], dataset, batch_size=5, optimize=True)
+    _, control = _split(server.requests)
+    assert control == [("songs", {"commit": "true"}), ("songs", {"optimize": "true"})]
+
+
+def test_send_update_gives_up_after_retries(solr):
+    server, url = solr
+    server.fail_first = 10
+    session = load_files_solr.make_session(1)
+    with pytest.raises(RuntimeError, match="503"):
+        load_files_solr.send_update(session, f"{url}/songs/update", b"[]", retries=2)
+    assert server.fail_first == 7
@@ -0,0 +1,18 @@
+import pandas as pd
+
+from profile_utils import profile_table
+
+
+def test_column_that_turns_into_text_in_a_later_chunk(tmp_path):
+    path = tmp_path / "songs.csv"
+    pd.DataFrame({
+        "year": ["1999", "2001", "2001", "unknown", "2001"],
+        "plays": [1, 2, 3, 4, 5],
+    }).to_csv(path, index=False)
+
+    report = profile_table(str(path), chunksize=2)
+    year = report["column_profiles"]["year"]
+    assert not year["dtype"].startswith("int")
+    assert "numeric" not in year
+    assert ["unknown", 1] in year["top"]
+    assert report["column_profiles"]["plays"]["numeric"]["max"] == 5
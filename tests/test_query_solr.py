@@ -0,0 +1,11 @@
+from query_solr import print_timings
+
+
+def test_print_timings_without_qtime_or_num_found(capsys):
+    print_timings({
+        1: {"core": "songs", "qtime_ms": None, "wall_ms": 3.2, "num_found": None, "cached": False},
+        2: {"core": "simple", "qtime_ms": 12, "wall_ms": 20.0, "num_found": 75, "cached": True},
+    }, 0.1)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].split() == ["1", "songs", "-", "3.2ms", "-"]
+    assert lines[2].split() == ["2", "simple", "12ms", "20.0ms", "75", "(cache)"]
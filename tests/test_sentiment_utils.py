@@ -0,0 +1,49 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import json
+
+import numpy as np
+import pandas as pd
+
+import sentiment_utils
+
+
+def _fake_score_batch(texts):
+    # VADER's lexicon is a download; the score only needs to depend on the text
+    return [len(t) / 100 for t in texts]
+
+
+def _noop():
+    pass
+
+
+def test_chunked_sentiments_reuse_one_pool(tmp_path, monkeypatch):
+    pools = []
+
+    class CountingPool(ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(sentiment_utils, "ProcessPoolExecutor", CountingPool)
+    monkeypatch.setattr(sentiment_utils, "_score_batch", _fake_score_batch)
+    monkeypatch.setattr(sentiment_utils, "_init_vader_worker", _noop)
+
+    # 3 chunks (700, 700, 100), the big ones split into batches for the pool
+    texts = [f"happy song {i} " * (i % 7 + 1) for i in range(1500)]
+    path = tmp_path / "songs.csv"
+    pd.DataFrame({"song_lyrics": texts}).to_csv(path, index=False)
+
+    _, _, scores = sentiment_utils.analyze_song_sentiments(
+        str(path), n_jobs=2, chunksize=700, return_scores=True,
+    )
+    assert len(pools) == 1
+    expected = _fake_score_batch(pd.read_csv(path)["song_lyrics"].fillna("").tolist())
+    np.testing.assert_allclose(scores, expected)
+
+    out = tmp_path / "mood.csv"
+    lexicon = tmp_path / "nrc.json"
+    lexicon.write_text(json.dumps({"happy": ["joy", "positive"]}))
+    sentiment_utils.add_mood_fields(str(path), str(out), chunksize=700, n_jobs=2, lexicon_path=str(lexicon))
+    assert len(pools) == 2
+    np.testing.assert_allclose(pd.read_csv(out)["polarity"], np.round(expected, 4))
@@ -0,0 +1,101 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import init
+
+
+class FakeSolrCloud(BaseHTTPRequestHandler):
+    """ConfigSets + Collections API of a SolrCloud node, kept in `server.state`."""
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, body=None):
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        state = self.server.state
+        action = q.get("action")
+        with self.server.lock:
+            state["calls"].append((url.path, action, q.get("name")))
+            configsets, collections = state["configsets"], state["collections"]
+            if url.path == "/solr/admin/info/system":
+                return self._send(200, {"mode": state["mode"]})
+            if state["mode"] != "solrcloud" and url.path in ("/solr/admin/configs", "/solr/admin/collections"):
+                return self._send(400, {"error": {"msg": "Solr instance is not running in SolrCloud mode."}})
+            if url.path == "/solr/admin/configs":
+                if action == "LIST":
+                    return self._send(200, {"configSets": sorted(configsets)})
+                if action == "CREATE" and q["name"] not in configsets:
+                    configsets[q["name"]] = dict(configsets[q["baseConfigSet"]])
+                    return self._send(200, {})
+                if action == "UPLOAD" and q["name"] in configsets:
+                    configsets[q["name"]][q["filePath"]] = body
+                    return self._send(200, {})
+            if url.path == "/solr/admin/collections":
+                if action == "LIST":
+                    return self._send(200, {"collections": sorted(collections)})
+                if action == "CREATE" and q["name"] not in collections and q["collection.configName"] in configsets:
+                    collections[q["name"]] = {"configName": q["collection.configName"], "numShards": q["numShards"],
+                                              "files": dict(configsets[q["collection.configName"]])}
+                    return self._send(200, {})
+        self._send(400, {"error": {"msg": f"bad request {self.path}"}})
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle(self.rfile.read(int(self.headers["Content-Length"])))
+
+
+@pytest.fixture
+def solr(tmp_path, monkeypatch):
+    synonyms, stopwords = tmp_path / "synonyms_hand.txt", tmp_path / "stopwords.txt"
+    synonyms.write_text("happy, glad\n")
+    stopwords.write_text("the\n")
+    monkeypatch.setattr(init, "SYNONYMS_FILE", synonyms)
+    monkeypatch.setattr(init, "STOPWORDS_FILE", stopwords)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSolrCloud)
+    server.lock = threading.Lock()
+    server.state = {"mode": "solrcloud", "configsets": {"_default": {}}, "collections": {}, "calls": []}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_port}/solr"
+    server.shutdown()
+
+
+def test_bootstrap_creates_collections_once(solr):
+    server, url = solr
+    state = server.state
+
+    assert sorted(init.bootstrap(url, cores=["simple", "songs"])) == ["simple", "songs"]
+    for core in ["simple", "songs"]:
+        collection = state["collections"][core]
+        assert collection["configName"] == f"{core}_conf"
+        assert collection["files"] == {"synonyms_hand.txt": b"happy, glad\n", "stopwords.txt": b"the\n"}
+    uploads = [c for c in state["calls"] if c[1] == "UPLOAD"]
+    assert uploads == [("/solr/admin/configs", "UPLOAD", "songs_base")] * 2
+
+    # a second run finds the collections and changes nothing
+    state["calls"].clear()
+    assert init.bootstrap(url, cores=["simple", "songs"]) == []
+    assert {c[1] for c in state["calls"]} <= {None, "LIST"}
+
+
+def test_bootstrap_refuses_standalone_solr(solr):
+    server, url = solr
+    server.state["mode"] = "std"
+    with pytest.raises(RuntimeError, match="SolrCloud"):
+        init.bootstrap(url)
+    assert not any(c[1] == "CREATE" for c in server.state["calls"])
@@ -0,0 +1,43 @@
+import copy
+from pathlib import Path
+
+from solrScript import diff_schema, parse_schema
+
+SCHEMA_SIMPLE = Path(__file__).resolve().parent.parent / "solr" / "schemaSimple.xml"
+
+# solr/schemaSimple.xml as GET /schema returns it once applied: analyzers
+# without filters have no "filters" key and booleans are JSON booleans
+LIVE_SIMPLE = {
+    "fieldTypes": [
+        {"name": "pfloat", "class": "solr.FloatPointField", "docValues": True},
+        {"name": "text_content", "class": "solr.TextField", "positionIncrementGap": "100",
+         "analyzer": {"tokenizer": {"class": "solr.StandardTokenizerFactory"}}},
+        {"name": "text_name", "class": "solr.TextField", "positionIncrementGap": "100",
+         "analyzer": {"tokenizer": {"class": "solr.StandardTokenizerFactory"}}},
+    ],
+    "fields": [
+        {"name": "id", "type": "string", "multiValued": False, "indexed": True, "required": True, "stored": True},
+        *({"name": name, "type": "text_content", "indexed": True, "stored": True}
+          for name in ["song_lyrics", "artist_bio"]),
+        *({"name": name, "type": "text_name", "indexed": True, "stored": True}
+          for name in ["song_name", "album_name", "artist_name"]),
+        *({"name": name, "type": "pfloat", "indexed": True, "stored": True}
+          for name in ["polarity", "emotion_anger", "emotion_anticipation", "emotion_disgust", "emotion_fear",
+                       "emotion_joy", "emotion_negative", "emotion_positive", "emotion_sadness",
+                       "emotion_surprise", "emotion_trust"]),
+    ],
+}
+
+
+def test_applied_schema_has_no_diff():
+    field_types, fields = parse_schema(SCHEMA_SIMPLE)
+    assert diff_schema(field_types, fields, LIVE_SIMPLE) == {}
+
+
+def test_changed_analyzer_is_replaced():
+    field_types, fields = parse_schema(SCHEMA_SIMPLE)
+    live = copy.deepcopy(LIVE_SIMPLE)
+    live["fieldTypes"][1]["analyzer"]["filters"] = [{"class": "solr.LowerCaseFilterFactory"}]
+    commands = diff_schema(field_types, fields, live)
+    assert [ft["name"] for ft in commands["replace-field-type"]] == ["text_content"]
+    assert list(commands) == ["replace-field-type"]
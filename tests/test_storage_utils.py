@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from storage_utils import compact_dtypes
+
+
+def test_compact_ids():
+    df = pd.DataFrame({
+        "whole": [1.0, 2.0, 3.0],
+        "missing": [1.0, np.nan, 3.0],
+        "fractional": [1.0, np.nan, 2.5],
+        "fractional_full": [1.5, 2.0, 3.0],
+        "too_big": [1.0, 2.0**31, np.nan],
+        "names": ["a", "b", "c"],
+    })
+    out = compact_dtypes(df, ids=df.columns)
+    assert out["whole"].dtype == "int32"
+    assert out["missing"].dtype == "Int32"
+    for col in ["fractional", "fractional_full", "too_big", "names"]:
+        assert out[col].dtype == df[col].dtype
+        assert out[col].equals(df[col])
@@ -0,0 +1,18 @@
+from wordcloud import STOPWORDS, WordCloud
+
+from term_utils import EXTRA_STOPWORDS, TermCounter
+
+
+def test_frequencies_match_wordcloud_on_possessive_stopwords():
+    stopwords = STOPWORDS | EXTRA_STOPWORDS
+    texts = [
+        "it's time's up, the moment's gone and the night's cold",
+        "time after time the moment's night songs and song's end 1999",
+        "dreams dream dream's love's love loves",
+    ]
+    counter = TermCounter(stopwords=stopwords)
+    counter.update(texts)
+
+    expected = WordCloud(stopwords=stopwords, collocations=False).process_text(" ".join(texts))
+    assert counter.frequencies() == expected
+    assert "time" not in counter.counts and "moment" not in counter.counts